@@ -0,0 +1,110 @@
+"""
+Incremental parsing of a streamed Exa /answer.
+
+With `"stream": true` Exa sends Server-Sent Events whose `data:` payloads
+carry answer text deltas (`choices[0].delta.content`) and, separately, the
+citations. `StructuredAnswerParser` is fed those deltas and reports each
+TITLE / DESCRIPTION / SCORE field as soon as it is complete, plus the
+ANALYSIS text as it grows. It only scans the new part of the answer on each
+feed and keeps just the tail that an unfinished field may still need (the
+caller keeps the full answer), so parsing stays linear in the answer length.
+
+The final FactCheckResponse is still built by ExaService._parse_structured_response
+on the complete answer, so validation is identical to the non-streaming path.
+"""
+import json
+import re
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+# Each field ends at the first newline (DESCRIPTION may also run into SCORE:)
+_FIELD_PATTERNS = {
+    "title": re.compile(r"TITLE:[ \t]*(\S[^\n]*?)[ \t]*\n", re.IGNORECASE),
+    "description": re.compile(r"DESCRIPTION:\s*(.+?)\s*(?:\n|SCORE:)", re.IGNORECASE | re.DOTALL),
+    "score": re.compile(r"SCORE:\s*(\d+)(?=\D)", re.IGNORECASE),
+    "analysis": re.compile(r"ANALYSIS:\s*(?=\S)", re.IGNORECASE),
+}
+_MARKERS = {name: re.compile(name.upper() + ":", re.IGNORECASE) for name in _FIELD_PATTERNS}
+# Rescan this much of the old buffer so a marker split across deltas is still found
+_OVERLAP = len("DESCRIPTION:")
+
+
+class StructuredAnswerParser:
+    def __init__(self):
+        # Unparsed tail of the answer; positions below are offsets into the whole answer
+        self._tail = ""
+        self._offset = 0
+        self.fields: Dict[str, object] = {}
+        self._scan_from = {name: 0 for name in _FIELD_PATTERNS}
+        self._marker_at: Dict[str, int] = {}
+        self._analysis_sent: Optional[int] = None
+
+    def feed(self, delta: str) -> List[Tuple[str, object]]:
+        """Append a text delta; return newly completed (field, value) pairs and ("analysis", new_text)."""
+        self._tail += delta
+        offset = self._offset
+        end = offset + len(self._tail)
+        events: List[Tuple[str, object]] = []
+
+        for name, pattern in _FIELD_PATTERNS.items():
+            if name in self.fields or (name == "analysis" and self._analysis_sent is not None):
+                continue
+            if name not in self._marker_at:
+                marker = _MARKERS[name].search(self._tail, max(0, self._scan_from[name] - offset))
+                if marker is None:
+                    self._scan_from[name] = max(offset, end - _OVERLAP)
+                    continue
+                self._marker_at[name] = offset + marker.start()
+            match = pattern.match(self._tail, self._marker_at[name] - offset)
+            if match is None:
+                continue
+            if name == "analysis":
+                # Analysis runs to the end of the answer; it is streamed as it grows
+                self._analysis_sent = offset + match.end()
+                continue
+            value = match.group(1).strip()
+            self.fields[name] = int(value) if name == "score" else value
+            events.append((name, self.fields[name]))
+
+        if self._analysis_sent is not None and end > self._analysis_sent:
+            events.append(("analysis", self._tail[self._analysis_sent - offset:]))
+            self._analysis_sent = end
+
+        # Drop text no pending field can still need, so each feed costs O(len(delta) + tail)
+        keep = min(
+            [self._marker_at.get(name, self._scan_from[name])
+             for name in _FIELD_PATTERNS if name not in self.fields and name != "analysis"]
+            + [self._analysis_sent if self._analysis_sent is not None
+               else self._marker_at.get("analysis", self._scan_from["analysis"])],
+        )
+        if keep > offset:
+            self._tail = self._tail[keep - offset:]
+            self._offset = keep
+        return events
+
+    def finish(self) -> List[Tuple[str, object]]:
+        """Flush at end of stream: fields that end the answer have no trailing newline."""
+        return [event for event in self.feed("\n") if event[0] != "analysis"]
+
+
+async def iter_answer_events(response: httpx.Response) -> AsyncIterator[dict]:
+    """Yield the decoded JSON payload of each `data:` line of an Exa SSE response."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if not data or data == "[DONE]":
+            continue
+        try:
+            yield json.loads(data)
+        except ValueError:
+            continue
+
+
+def answer_delta(payload: dict) -> str:
+    """Text carried by one streamed chunk (OpenAI-style delta, or a bare `content`/`answer`)."""
+    choices = payload.get("choices")
+    if choices:
+        return (choices[0].get("delta") or {}).get("content") or ""
+    return payload.get("content") or payload.get("answer") or ""
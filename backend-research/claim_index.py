@@ -0,0 +1,264 @@
+"""
+Near-duplicate index over previously fact-checked claims.
+
+Claims are reduced to character shingles of their normalized text, summarized
+with MinHash and bucketed with LSH banding, so a lookup only touches the few
+claims that share a band with the query instead of scanning every stored
+claim. Candidates are ranked by estimated Jaccard similarity and the best one
+above the threshold is returned together with its fact-check cache key.
+Shingle overlap cannot tell "rose" from "fell" or "1.1" from "2.1", so a
+candidate is only reused when it also carries exactly the same numbers and
+negation words as the query. Hashing is pure Python (a few milliseconds per
+claim); async callers run `query` and `signature` in a worker thread.
+Signatures are persisted next to the fact-check cache so the index survives
+restarts; the cache's prune pass deletes signatures whose entry it dropped, and
+`load` skips (and deletes) any whose entry has since expired.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import struct
+import re
+import threading
+import time
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from fact_check_cache import normalize_claim
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_SEED = 1
+
+_NUMBER_RE = re.compile(r"\d+")
+# Tokens of normalized text (punctuation is already gone, so "don't" arrives as "don t")
+_NEGATIONS = {
+    "no", "not", "never", "none", "nobody", "nothing", "nowhere", "neither", "nor", "without",
+    "cannot", "t", "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "cant",
+    "couldnt", "wont", "wouldnt", "shouldnt", "hasnt", "havent", "hadnt",
+}
+
+
+class ClaimMatch(NamedTuple):
+    key: str
+    claim: str
+    similarity: float
+
+
+def _shingles(text: str, size: int) -> Set[str]:
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _guard(normalized: str) -> Tuple[Tuple[str, ...], int]:
+    """Numbers and negation count of a normalized claim; both must match for reuse."""
+    tokens = normalized.split()
+    numbers = tuple(sorted(t for t in tokens if _NUMBER_RE.fullmatch(t)))
+    return numbers, sum(1 for t in tokens if t in _NEGATIONS)
+
+
+def _hash64(shingle: str) -> int:
+    return struct.unpack("<Q", hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest())[0]
+
+
+def _false_positive(threshold: float, bands: int, rows: int, steps: int = 100) -> float:
+    step = threshold / steps
+    return sum(1 - (1 - (i * step) ** rows) ** bands for i in range(steps)) * step
+
+
+def _false_negative(threshold: float, bands: int, rows: int, steps: int = 100) -> float:
+    step = (1 - threshold) / steps
+    return sum((1 - (threshold + i * step) ** rows) ** bands for i in range(steps)) * step
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) minimizing the weighted false positive/negative area around the threshold."""
+    best, best_error = (num_perm, 1), float("inf")
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        error = _false_positive(threshold, bands, rows) + _false_negative(threshold, bands, rows)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class ClaimIndex:
+    def __init__(
+        self,
+        path: Optional[str],
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+    ):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        # Universal hash family (a * x + b) mod p, fixed seed so persisted signatures stay valid
+        rng = hashlib.blake2b(f"claim-index:{_SEED}:{num_perm}".encode(), digest_size=64)
+        params: List[Tuple[int, int]] = []
+        while len(params) < num_perm:
+            rng.update(b"\x00")
+            raw = rng.digest()
+            for offset in range(0, len(raw), 16):
+                a = int.from_bytes(raw[offset:offset + 8], "little") % (_MERSENNE_PRIME - 1) + 1
+                b = int.from_bytes(raw[offset + 8:offset + 16], "little") % _MERSENNE_PRIME
+                params.append((a, b))
+        self._perms = params[:num_perm]
+
+        self._keys: List[Optional[str]] = []
+        self._claims: List[str] = []
+        self._guards: List[Tuple[Tuple[str, ...], int]] = []
+        self._signatures: List[bytes] = []
+        self._ids: Dict[str, int] = {}
+        self._buckets: List[Dict[int, List[int]]] = [dict() for _ in range(self.bands)]
+        self.queries = 0
+        self.matches = 0
+
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS claim_signatures (
+                    key TEXT PRIMARY KEY,
+                    claim TEXT NOT NULL,
+                    num_perm INTEGER NOT NULL,
+                    signature BLOB NOT NULL
+                )
+                """
+            )
+
+    def signature(self, claim: str) -> bytes:
+        hashes = [_hash64(s) for s in _shingles(normalize_claim(claim), self.shingle_size)]
+        if not hashes:
+            return array("I", [_MAX_HASH] * self.num_perm).tobytes()
+        p = _MERSENNE_PRIME
+        return array(
+            "I", [min((a * x + b) % p for x in hashes) & _MAX_HASH for a, b in self._perms]
+        ).tobytes()
+
+    def load(self) -> int:
+        """Load persisted signatures; call once at startup (blocking)."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            if self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fact_checks'"
+            ).fetchone():
+                # Only claims whose fact-check is still cached can be reused
+                self._db.execute(
+                    """
+                    DELETE FROM claim_signatures WHERE key NOT IN (
+                        SELECT key FROM fact_checks WHERE expires_at > ?
+                    )
+                    """,
+                    (time.time(),),
+                )
+            rows = self._db.execute(
+                "SELECT key, claim, signature FROM claim_signatures WHERE num_perm = ?",
+                (self.num_perm,),
+            ).fetchall()
+        for key, claim, signature in rows:
+            self._insert(key, claim, signature)
+        return len(rows)
+
+    def query(self, claim: str) -> Optional[ClaimMatch]:
+        """Return the most similar stored claim at or above the threshold (blocking; CPU-bound)."""
+        self.queries += 1
+        signature = self.signature(claim)
+        guard = _guard(normalize_claim(claim))
+        query_sig = array("I")
+        query_sig.frombytes(signature)
+
+        candidates: Set[int] = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(tuple(self._buckets[band].get(band_key, ())))
+
+        best: Optional[ClaimMatch] = None
+        for idx in candidates:
+            key = self._keys[idx]
+            if key is None or self._guards[idx] != guard:
+                continue
+            stored = array("I")
+            stored.frombytes(self._signatures[idx])
+            agree = sum(1 for x, y in zip(query_sig, stored) if x == y)
+            similarity = agree / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = ClaimMatch(key=key, claim=self._claims[idx], similarity=round(similarity, 4))
+        if best is not None:
+            self.matches += 1
+        return best
+
+    async def add(self, key: str, claim: str) -> None:
+        """Index a claim under its fact-check cache key and persist the signature."""
+        if key in self._ids:
+            return
+        normalized = normalize_claim(claim)
+        signature = await asyncio.to_thread(self.signature, claim)
+        if key in self._ids:
+            return
+        self._insert(key, normalized, signature)
+        if self._db is not None:
+            await asyncio.to_thread(self._persist, key, normalized, signature)
+
+    async def discard(self, key: str) -> None:
+        """Forget a claim whose cached fact-check is gone (expired or evicted)."""
+        idx = self._ids.pop(key, None)
+        if idx is None:
+            return
+        self._keys[idx] = None
+        if self._db is not None:
+            await asyncio.to_thread(self._unpersist, key)
+
+    def stats(self) -> Dict:
+        return {
+            "claims": len(self._ids),
+            "queries": self.queries,
+            "matches": self.matches,
+            "threshold": self.threshold,
+            "bands": self.bands,
+            "rows": self.rows,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def _band_keys(self, signature: bytes) -> List[int]:
+        width = self.rows * 4
+        return [hash(signature[i * width:(i + 1) * width]) for i in range(self.bands)]
+
+    def _insert(self, key: str, claim: str, signature: bytes) -> None:
+        idx = len(self._keys)
+        self._guards.append(_guard(claim))
+        self._keys.append(key)
+        self._claims.append(claim)
+        self._signatures.append(signature)
+        self._ids[key] = idx
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, []).append(idx)
+
+    def _persist(self, key: str, claim: str, signature: bytes) -> None:
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO claim_signatures (key, claim, num_perm, signature)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, claim, self.num_perm, signature),
+            )
+
+    def _unpersist(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM claim_signatures WHERE key = ?", (key,))
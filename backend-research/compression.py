@@ -0,0 +1,43 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Brotli (via the optional `brotli-asgi` package, with gzip fallback) when
+installed, plain gzip otherwise. Streaming routes and video files are passed
+through untouched: compressors buffer output, which would hold back NDJSON/SSE
+events, and Range responses must not be re-encoded.
+
+This file is kept identical in backend-research and backend-video-embedding:
+each service is built with its own directory as the Docker context, so neither
+image can import the other's copy. Change both; the embedding service's
+test_shared_modules.py fails when they differ.
+"""
+import logging
+from typing import Iterable
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, exclude_prefixes: Iterable[str] = ()):
+        self.app = app
+        self.exclude_prefixes = tuple(exclude_prefixes)
+        if BROTLI_AVAILABLE:
+            self.compressed = BrotliMiddleware(app, quality=4, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            logger.info("brotli-asgi not installed; compressing responses with gzip only")
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].startswith(self.exclude_prefixes):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
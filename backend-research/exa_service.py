@@ -1,19 +1,45 @@
 ﻿import os
+import asyncio
+import math
+import time
 import httpx
 import json
 import re
-from typing import Optional
+from typing import AsyncIterator, Optional
 from fastapi import HTTPException
 from models import ExaAnswerResponse, FactCheckResponse, AnswerCitation
+from fact_check_cache import FactCheckCache, normalize_claim
+from claim_index import ClaimIndex
+from singleflight import SingleFlight
+from answer_stream import StructuredAnswerParser, answer_delta, iter_answer_events
+from resilience import CircuitOpenError, Resilience
+import metrics
+import tracing
 
 
 class ExaService:
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[FactCheckCache] = None,
+        claim_index: Optional[ClaimIndex] = None,
+        inflight: Optional[SingleFlight] = None,
+        resilience: Optional[Resilience] = None,
+    ):
         self.api_key = os.getenv("EXA_API_KEY")
         if not self.api_key:
             raise ValueError("EXA_API_KEY environment variable is required")
         
-        self.base_url = "https://api.exa.ai"
+        # Shared keep-alive pool from the app lifespan; None means one client per call
+        self.client = client
+        self.base_url = str(client.base_url).rstrip("/") if client else "https://api.exa.ai"
+        self.cache = cache
+        # Near-duplicate lookup only makes sense on top of the result cache
+        self.claim_index = claim_index if cache is not None else None
+        # App-lifetime coalescing of identical claims already being checked upstream
+        self.inflight = inflight
+        # App-lifetime retry/hedging/circuit-breaker state for Exa calls
+        self.resilience = resilience
         self.headers = {
             "x-api-key": self.api_key,
             "Content-Type": "application/json"
@@ -21,45 +47,268 @@ class ExaService:
     
     async def answer_query(self, query: str) -> ExaAnswerResponse:
         """Call the Exa answer API to get information about a query."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/answer",
-                    headers=self.headers,
-                    json={
-                        "query": query,
-                        "stream": False,
-                        "text": True
-                    },
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                return ExaAnswerResponse(**data)
-                
-            except httpx.HTTPStatusError as e:
-                raise HTTPException(
-                    status_code=e.response.status_code,
-                    detail=f"Exa API error: {e.response.text}"
-                )
-            except httpx.RequestError as e:
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"Failed to connect to Exa API: {str(e)}"
-                )
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Unexpected error calling Exa API: {str(e)}"
-                )
+        if self.client is not None:
+            return await self._post_answer(self.client, query)
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            return await self._post_answer(client, query)
+
+    async def _post_answer(self, client: httpx.AsyncClient, query: str) -> ExaAnswerResponse:
+        async def send() -> httpx.Response:
+            response = await client.post(
+                f"{self.base_url}/answer",
+                headers=self.headers,
+                json={
+                    "query": query,
+                    "stream": False,
+                    "text": True
+                },
+            )
+            response.raise_for_status()
+            return response
+
+        try:
+            with tracing.span("exa"):
+                if self.resilience is not None:
+                    response = await self.resilience.call(send)
+                else:
+                    response = await send()
+            
+            data = response.json()
+            exa_response = ExaAnswerResponse(**data)
+            metrics.record_exa_cost(exa_response.costDollars)
+            return exa_response
+            
+        except CircuitOpenError as e:
+            raise _unavailable(e)
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(
+                status_code=e.response.status_code,
+                detail=f"Exa API error: {e.response.text}"
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Failed to connect to Exa API: {str(e)}"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unexpected error calling Exa API: {str(e)}"
+            )
     
-    async def fact_check_claim(self, claim: str) -> FactCheckResponse:
+    async def fact_check_claim(self, claim: str, refresh: bool = False) -> FactCheckResponse:
+        """
+        Fact-check a claim, serving repeats (exact or near-duplicate) from the cache
+        when one is configured. Pass refresh=True to skip the cache lookup and
+        overwrite the stored result.
+
+        Concurrent misses for the same normalized claim share one upstream call
+        when `inflight` is set; callers apply their own clip span afterwards.
+        """
+        if self.cache is not None:
+            if refresh:
+                self.cache.record_bypass()
+                metrics.FACTCHECK_LOOKUPS.labels("bypass").inc()
+            else:
+                with tracing.span("cache"):
+                    cached = await self.cache.get(claim)
+                    similar = await self._lookup_similar(claim) if cached is None else None
+                if cached is not None:
+                    metrics.FACTCHECK_LOOKUPS.labels("hit").inc()
+                    return cached.model_copy(update={"cached": True})
+                if similar is not None:
+                    metrics.FACTCHECK_LOOKUPS.labels("similar").inc()
+                    return similar
+
+        if self.inflight is None:
+            metrics.FACTCHECK_LOOKUPS.labels("miss").inc()
+            return await self._check_and_store(claim)
+        started = time.perf_counter()
+        result, shared = await self.inflight.do(normalize_claim(claim), lambda: self._check_and_store(claim))
+        metrics.FACTCHECK_LOOKUPS.labels("coalesced" if shared else "miss").inc()
+        if shared:
+            # The leader's exa/parse spans are in the leader's trace; this one only waited
+            tracing.record("coalesced", time.perf_counter() - started)
+        return result
+
+    async def _check_and_store(self, claim: str) -> FactCheckResponse:
+        result = await self._fact_check_uncached(claim)
+        await self._store(claim, result)
+        return result
+
+    async def _store(self, claim: str, result: FactCheckResponse) -> None:
+        if self.cache is not None:
+            with tracing.span("store"):
+                key = await self.cache.set(claim, result)
+                if self.claim_index is not None:
+                    await self.claim_index.add(key, claim)
+
+    async def fact_check_claim_stream(self, claim: str, refresh: bool = False) -> AsyncIterator[dict]:
+        """
+        Streaming fact-check. Yields events as Exa generates the answer:
+          {"event": "field", "name": "title" | "description" | "score", "value": ...}
+          {"event": "verdict", "title": ..., "truthfulnessScore": n}   once both are known
+          {"event": "analysis", "delta": "..."}                         analysis text as it grows
+          {"event": "result", "result": FactCheckResponse}              always last
+        Cache hits (exact or near-duplicate) yield only the result.
+        """
+        if self.cache is not None:
+            if refresh:
+                self.cache.record_bypass()
+                metrics.FACTCHECK_LOOKUPS.labels("bypass").inc()
+            else:
+                cached = await self.cache.get(claim)
+                if cached is None:
+                    cached = await self._lookup_similar(claim)
+                    result_label = "similar"
+                else:
+                    cached = cached.model_copy(update={"cached": True})
+                    result_label = "hit"
+                if cached is not None:
+                    metrics.FACTCHECK_LOOKUPS.labels(result_label).inc()
+                    yield {"event": "result", "result": cached}
+                    return
+        metrics.FACTCHECK_LOOKUPS.labels("miss").inc()
+
+        parser = StructuredAnswerParser()
+        parts = []
+        citations = []
+        cost = None
+        verdict_sent = False
+        async for payload in self._stream_answer(self._fact_check_query(claim)):
+            if payload.get("citations"):
+                citations = [AnswerCitation(**c) for c in payload["citations"]]
+            if payload.get("costDollars"):
+                cost = payload["costDollars"]
+            delta = answer_delta(payload)
+            if not delta:
+                continue
+            parts.append(delta)
+            for name, value in parser.feed(delta):
+                if name == "analysis":
+                    yield {"event": "analysis", "delta": value}
+                    continue
+                yield {"event": "field", "name": name, "value": value}
+            if not verdict_sent and "score" in parser.fields and "title" in parser.fields:
+                verdict_sent = True
+                yield {"event": "verdict", "title": parser.fields["title"],
+                       "truthfulnessScore": parser.fields["score"]}
+        for name, value in parser.finish():
+            yield {"event": "field", "name": name, "value": value}
+
+        exa_response = ExaAnswerResponse(answer="".join(parts), citations=citations, costDollars=cost)
+        metrics.record_exa_cost(exa_response.costDollars)
+        result = self._to_fact_check(exa_response, claim)
+        await self._store(claim, result)
+        yield {"event": "result", "result": result}
+
+    async def _stream_answer(self, query: str) -> AsyncIterator[dict]:
+        """
+        POST /answer with stream=True and yield each decoded SSE payload.
+
+        With `resilience` set the breaker applies and a failed attempt is retried
+        as long as nothing has been yielded yet; streams aren't hedged.
+        """
+        client = self.client or httpx.AsyncClient(timeout=30.0)
+        started = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                streamed = False
+                if self.resilience is not None:
+                    try:
+                        self.resilience.acquire()
+                    except CircuitOpenError as e:
+                        raise _unavailable(e)
+                outcome: Optional[BaseException] = None
+                try:
+                    async with client.stream(
+                        "POST",
+                        f"{self.base_url}/answer",
+                        headers=self.headers,
+                        json={"query": query, "stream": True, "text": True},
+                    ) as response:
+                        if response.status_code >= 400:
+                            body = await response.aread()
+                            outcome = httpx.HTTPStatusError(
+                                "Exa API error", request=response.request, response=response
+                            )
+                            raise HTTPException(
+                                status_code=response.status_code,
+                                detail=f"Exa API error: {body.decode('utf-8', errors='replace')}"
+                            )
+                        async for payload in iter_answer_events(response):
+                            streamed = True
+                            yield payload
+                    outcome = None
+                    return
+                except httpx.RequestError as e:
+                    outcome = e
+                    error = HTTPException(
+                        status_code=503,
+                        detail=f"Failed to connect to Exa API: {str(e)}"
+                    )
+                except HTTPException as e:
+                    error = e
+                except (asyncio.CancelledError, GeneratorExit):
+                    # Caller went away mid-stream: neither a success nor an upstream failure
+                    outcome = asyncio.CancelledError()
+                    raise
+                except BaseException as e:
+                    outcome = e
+                    raise
+                finally:
+                    if self.resilience is not None:
+                        self.resilience.record(outcome)
+                delay = None
+                if self.resilience is not None and not streamed and outcome is not None:
+                    delay = self.resilience.retry_delay(attempt, outcome, started)
+                if delay is None:
+                    raise error
+                self.resilience.retries += 1
+                await asyncio.sleep(delay)
+        finally:
+            if client is not self.client:
+                await client.aclose()
+
+    async def _lookup_similar(self, claim: str) -> Optional[FactCheckResponse]:
+        """Reuse the fact-check of a paraphrased prior claim above the similarity threshold."""
+        if self.claim_index is None:
+            return None
+        match = await asyncio.to_thread(self.claim_index.query, claim)
+        if match is None:
+            return None
+        prior = await self.cache.get_by_key(match.key)
+        if prior is None:
+            await self.claim_index.discard(match.key)
+            return None
+        return prior.model_copy(update={
+            "cached": True,
+            "similarity": match.similarity,
+            "matchedClaim": match.claim,
+        })
+
+    async def _fact_check_uncached(self, claim: str) -> FactCheckResponse:
         """
         Fact-check a claim using Exa's answer API.
         """
+        try:
+            # Get information from Exa
+            exa_response = await self.answer_query(self._fact_check_query(claim))
+        except HTTPException:
+            # Keep the upstream status (e.g. 503 + Retry-After while the Exa circuit is open)
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error during fact-checking: {str(e)}"
+            )
+        return self._to_fact_check(exa_response, claim)
+
+    def _fact_check_query(self, claim: str) -> str:
         # Create a structured fact-checking query that asks for specific format
-        fact_check_query = f"""
+        return f"""
         Please fact-check this claim and provide your response in this exact format:
         
         TITLE: [A very short title for the claim]
@@ -69,11 +318,13 @@ class ExaService:
         
         Claim to fact-check: {claim}
         """
-        
+
+    def _to_fact_check(self, exa_response: ExaAnswerResponse, claim: str) -> FactCheckResponse:
+        with tracing.span("parse"):
+            return self._build_fact_check(exa_response, claim)
+
+    def _build_fact_check(self, exa_response: ExaAnswerResponse, claim: str) -> FactCheckResponse:
         try:
-            # Get information from Exa
-            exa_response = await self.answer_query(fact_check_query)
-            
             # Parse the structured response
             parsed_response = self._parse_structured_response(exa_response.answer, claim)
             
@@ -88,6 +339,7 @@ class ExaService:
             )
             
         except ValueError as e:
+            metrics.FACTCHECK_PARSE_FAILURES.inc()
             raise HTTPException(
                 status_code=422,
                 detail=f"Format validation error: {str(e)}"
@@ -160,3 +412,11 @@ class ExaService:
         if len(title) > 60:
             title = title[:57] + "..."
         return title
+
+
+def _unavailable(e: CircuitOpenError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Exa API unavailable: {str(e)}",
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
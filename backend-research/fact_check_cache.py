@@ -0,0 +1,216 @@
+"""
+Two-tier cache for fact-check results keyed on the normalized claim.
+
+Tier 1 is an in-process LRU so repeat claims are answered without leaving the
+event loop; tier 2 is a SQLite file so results survive restarts and are shared
+between workers. Entries expire after a TTL and each tier is capped by entry
+count. Results are stored without the per-request startSec/endSec.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from models import FactCheckResponse
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+# Fields that belong to a single request rather than to the claim itself
+PER_REQUEST_FIELDS = {"startSec", "endSec", "cached", "similarity", "matchedClaim"}
+
+# Run disk-tier eviction once every this many writes
+_PRUNE_EVERY = 100
+
+
+def normalize_claim(claim: str) -> str:
+    """Case-fold, strip punctuation and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", claim).casefold()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def claim_key(claim: str) -> str:
+    return hashlib.sha256(normalize_claim(claim).encode("utf-8")).hexdigest()
+
+
+class FactCheckCache:
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl_seconds: float,
+        memory_size: int,
+        disk_size: int,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.memory_size = max(0, memory_size)
+        self.disk_size = max(0, disk_size)
+        self._memory: "OrderedDict[str, Tuple[float, FactCheckResponse]]" = OrderedDict()
+        self._writes = 0
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.bypasses = 0
+
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path and self.disk_size:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fact_checks (
+                    key TEXT PRIMARY KEY,
+                    claim TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS fact_checks_accessed ON fact_checks (accessed_at)")
+
+    async def get(self, claim: str) -> Optional[FactCheckResponse]:
+        """Return the cached result for a claim, or None on a miss."""
+        tier, result = await self._lookup(claim_key(claim))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits[tier] += 1
+        return result
+
+    async def get_by_key(self, key: str) -> Optional[FactCheckResponse]:
+        """Look up a result by cache key without touching the hit/miss counters."""
+        _, result = await self._lookup(key)
+        return result
+
+    async def _lookup(self, key: str) -> Tuple[Optional[str], Optional[FactCheckResponse]]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                return "memory", result
+            del self._memory[key]
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key, now)
+            if row is not None:
+                expires_at, payload = row
+                result = FactCheckResponse.model_validate_json(payload)
+                self._remember(key, expires_at, result)
+                return "disk", result
+
+        return None, None
+
+    async def set(self, claim: str, result: FactCheckResponse) -> str:
+        """Store a result for a claim and return its cache key."""
+        key = claim_key(claim)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        stored = result.model_copy(
+            update={"startSec": None, "endSec": None, "cached": False, "similarity": None, "matchedClaim": None}
+        )
+        self._remember(key, expires_at, stored)
+        if self._db is not None:
+            payload = stored.model_dump_json(exclude=PER_REQUEST_FIELDS)
+            await asyncio.to_thread(self._disk_set, key, normalize_claim(claim), payload, now, expires_at)
+        return key
+
+    def record_bypass(self) -> None:
+        self.bypasses += 1
+
+    def stats(self) -> Dict:
+        hits = self.hits["memory"] + self.hits["disk"]
+        lookups = hits + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+            "memoryEntries": len(self._memory),
+            "diskEntries": self._disk_count() if self._db is not None else 0,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, expires_at: float, result: FactCheckResponse) -> None:
+        if not self.memory_size:
+            return
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires_at, payload FROM fact_checks WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                self._db.execute("DELETE FROM fact_checks WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE fact_checks SET accessed_at = ? WHERE key = ?", (now, key))
+            return row
+
+    def _disk_set(self, key: str, claim: str, payload: str, now: float, expires_at: float) -> None:
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO fact_checks (key, claim, payload, created_at, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    claim = excluded.claim,
+                    payload = excluded.payload,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at,
+                    accessed_at = excluded.accessed_at
+                """,
+                (key, claim, payload, now, expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        """Drop expired rows, then the least recently used rows above disk_size, then orphaned claim signatures."""
+        self._db.execute("DELETE FROM fact_checks WHERE expires_at <= ?", (now,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM fact_checks").fetchone()
+        overflow = count - self.disk_size
+        if overflow > 0:
+            self._db.execute(
+                """
+                DELETE FROM fact_checks WHERE key IN (
+                    SELECT key FROM fact_checks ORDER BY accessed_at ASC LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+        # claim_index.py keeps its signatures in the same file; drop the ones whose entry just went
+        if self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'claim_signatures'"
+        ).fetchone():
+            self._db.execute(
+                "DELETE FROM claim_signatures WHERE key NOT IN (SELECT key FROM fact_checks)"
+            )
+
+    def _disk_count(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM fact_checks").fetchone()
+        return count
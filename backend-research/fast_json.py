@@ -0,0 +1,30 @@
+"""
+Fast JSON encoding for the hot response paths.
+
+`dumps` uses orjson when it is installed (stdlib json otherwise).
+Pydantic models are serialized with `model_dump_json`, which runs in
+pydantic-core, instead of FastAPI's response_model re-validation.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps(obj: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` (content must already be JSON-ready)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
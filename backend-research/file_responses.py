@@ -0,0 +1,221 @@
+"""
+File responses with HTTP range and conditional request support.
+
+RangeFileResponse answers Range/If-Range with 206 (single range) or
+multipart/byteranges (several ranges), 416 for unsatisfiable ranges, and
+If-None-Match/If-Modified-Since with 304. The body is sent through the ASGI
+zero-copy extension (sendfile) when the server advertises it, otherwise read
+from disk in large chunks in a worker thread.
+"""
+import os
+import re
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 1024 * 1024
+MAX_RANGES = 16  # more than this is treated as abuse and served as a full response
+
+_RANGE_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+ByteRange = Tuple[int, int]  # inclusive start, inclusive end
+
+
+def file_etag(stat: os.stat_result, content_hash: Optional[str] = None) -> str:
+    """Strong ETag: the content hash when known, else inode/size/mtime of the (immutable) file."""
+    if content_hash:
+        return f'"{content_hash}"'
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int) -> Optional[List[ByteRange]]:
+    """
+    Parse a `Range: bytes=...` header. Returns None if the header is absent or
+    malformed (serve the full file), [] if no range is satisfiable (416),
+    otherwise sorted, merged inclusive ranges.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+    ranges: List[ByteRange] = []
+    parts = spec.split(",")
+    if len(parts) > MAX_RANGES:
+        return None
+    for part in parts:
+        match = _RANGE_RE.match(part)
+        if not match:
+            return None
+        first, last = match.groups()
+        if not first and not last:
+            return None
+        if not first:  # suffix range: last N bytes
+            length = int(last)
+            if length == 0:
+                continue
+            ranges.append((max(0, size - length), size - 1))
+            continue
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, end))
+
+    ranges.sort()
+    merged: List[ByteRange] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    candidates = [t.strip() for t in header.split(",")]
+    if "*" in candidates:
+        return True
+    if weak:
+        bare = etag[2:] if etag.startswith("W/") else etag
+        return any((c[2:] if c.startswith("W/") else c) == bare for c in candidates)
+    return etag in candidates
+
+
+def _not_modified_since(header: Optional[str], mtime: float) -> bool:
+    if not header:
+        return False
+    try:
+        return int(mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _if_range_allows(header: Optional[str], etag: str, mtime: float) -> bool:
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        return header == etag  # strong comparison only
+    return _not_modified_since(header, mtime)
+
+
+class RangeFileResponse(Response):
+    def __init__(
+        self,
+        request: Request,
+        path: str,
+        media_type: str,
+        headers: Optional[Mapping[str, str]] = None,
+        content_hash: Optional[str] = None,
+        stat: Optional[os.stat_result] = None,
+    ):
+        self.path = path
+        self.stat = stat or os.stat(path)
+        self.file_size = self.stat.st_size
+        self.media_type = media_type
+        self.background = None
+        self.ranges: List[ByteRange] = []
+        self.boundary: Optional[str] = None
+
+        etag = file_etag(self.stat, content_hash)
+        base_headers = {
+            **(headers or {}),
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(self.stat.st_mtime, usegmt=True),
+        }
+        req_headers = request.headers
+        if_none_match = req_headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag, weak=True)
+        else:
+            not_modified = _not_modified_since(req_headers.get("if-modified-since"), self.stat.st_mtime)
+
+        if not_modified:
+            self.status_code = 304
+            self.media_type = None
+            self.init_headers(base_headers)
+            return
+
+        ranges = None
+        range_header = req_headers.get("range")
+        if range_header and _if_range_allows(req_headers.get("if-range"), etag, self.stat.st_mtime):
+            ranges = parse_range(range_header, self.file_size)
+
+        if ranges is None:
+            self.status_code = 200
+            self.ranges = [(0, self.file_size - 1)] if self.file_size else []
+            self.init_headers({**base_headers, "content-length": str(self.file_size)})
+        elif not ranges:
+            self.status_code = 416
+            self.media_type = None
+            self.init_headers({**base_headers, "content-range": f"bytes */{self.file_size}", "content-length": "0"})
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = 206
+            self.ranges = ranges
+            self.init_headers({
+                **base_headers,
+                "content-range": f"bytes {start}-{end}/{self.file_size}",
+                "content-length": str(end - start + 1),
+            })
+        else:
+            self.status_code = 206
+            self.ranges = ranges
+            self.boundary = secrets.token_hex(16)
+            length = sum(len(self._part_header(s, e)) + (e - s + 1) + 2 for s, e in ranges)
+            length += len(self._closing())
+            self.init_headers({
+                **base_headers,
+                "content-type": f"multipart/byteranges; boundary={self.boundary}",
+                "content-length": str(length),
+            })
+
+    def _part_header(self, start: int, end: int) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.media_type or 'application/octet-stream'}\r\n"
+            f"Content-Range: bytes {start}-{end}/{self.file_size}\r\n\r\n"
+        ).encode("latin-1")
+
+    def _closing(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or not self.ranges:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zerocopy = "http.response.zerocopysend" in scope.get("extensions", {})
+        multipart = self.boundary is not None
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            for start, end in self.ranges:
+                if multipart:
+                    await send({"type": "http.response.body", "body": self._part_header(start, end), "more_body": True})
+                if zerocopy:
+                    await send({
+                        "type": "http.response.zerocopysend",
+                        "file": f.wrapped.fileno(),
+                        "offset": start,
+                        "count": end - start + 1,
+                        "more_body": True,
+                    })
+                else:
+                    await f.seek(start)
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        chunk = await f.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        remaining -= len(chunk)
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                if multipart:
+                    await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+            tail = self._closing() if multipart else b""
+            await send({"type": "http.response.body", "body": tail, "more_body": False})
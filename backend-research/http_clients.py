@@ -0,0 +1,83 @@
+"""
+App-lifetime httpx connection pools, one per upstream.
+
+The clients are created in the FastAPI lifespan (see main.py) and shared by
+every request so repeat calls reuse keep-alive connections instead of paying
+a TCP+TLS handshake each time.
+"""
+import logging
+import httpx
+from metrics import InstrumentedTransport
+from resilience import Resilience
+from settings import Settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _http2(enabled: bool, upstream: str) -> bool:
+    if enabled and not HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested for %s but 'h2' is not installed; using HTTP/1.1", upstream)
+        return False
+    return enabled
+
+
+def _transport(upstream: str, http2: bool, limits: httpx.Limits) -> httpx.AsyncBaseTransport:
+    # Pool settings live on the transport when one is passed to the client; the wrapper feeds /metrics
+    return InstrumentedTransport(httpx.AsyncHTTPTransport(http2=http2, limits=limits), upstream)
+
+
+def build_exa_client(settings: Settings) -> httpx.AsyncClient:
+    """Pooled client for the Exa API."""
+    return httpx.AsyncClient(
+        base_url=settings.EXA_BASE_URL,
+        timeout=httpx.Timeout(settings.EXA_TIMEOUT),
+        transport=_transport(
+            "exa",
+            http2=_http2(settings.EXA_HTTP2, "exa"),
+            limits=httpx.Limits(
+                max_connections=settings.EXA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.EXA_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        ),
+    )
+
+
+def build_exa_resilience(settings: Settings) -> Resilience:
+    """Retry/hedging/breaker state shared by every Exa call (see resilience.py)."""
+    return Resilience(
+        name="exa",
+        retry_attempts=settings.EXA_RETRY_ATTEMPTS,
+        retry_base_delay=settings.EXA_RETRY_BASE_DELAY,
+        retry_max_delay=settings.EXA_RETRY_MAX_DELAY,
+        retry_budget=settings.EXA_RETRY_BUDGET,
+        hedge_percentile=settings.EXA_HEDGE_PERCENTILE,
+        hedge_min_samples=settings.EXA_HEDGE_MIN_SAMPLES,
+        hedge_min_delay=settings.EXA_HEDGE_MIN_DELAY,
+        breaker_failures=settings.EXA_BREAKER_FAILURES,
+        breaker_reset=settings.EXA_BREAKER_RESET,
+        retry_read_timeouts=settings.EXA_RETRY_READ_TIMEOUTS,
+    )
+
+
+def build_rapidapi_client(settings: Settings) -> httpx.AsyncClient:
+    """Pooled client for the RapidAPI video downloader (JSON calls and file downloads)."""
+    return httpx.AsyncClient(
+        base_url=settings.rapidapi_base_url,
+        timeout=httpx.Timeout(settings.RAPIDAPI_TIMEOUT),
+        transport=_transport(
+            "rapidapi",
+            http2=_http2(settings.RAPIDAPI_HTTP2, "rapidapi"),
+            limits=httpx.Limits(
+                max_connections=settings.RAPIDAPI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.RAPIDAPI_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        ),
+    )
@@ -1,17 +1,35 @@
 import json
 # from fastapi import FastAPI, HTTPException, Depends
-from fastapi import FastAPI, HTTPException, Depends, Request, Response
-from pydantic import BaseModel, HttpUrl, field_validator
-import os, httpx, uuid
-from ytdl import download_to_disk
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Header, Query
+from pydantic import BaseModel, HttpUrl, TypeAdapter, field_validator
+import os, httpx, asyncio
+from contextlib import asynccontextmanager
+from ytdl import DownloadError, JobTimeout, download_to_disk_async, parse_response, upstream_error
+from singleflight import SingleFlight
 from settings import settings
+from http_clients import build_exa_client, build_exa_resilience, build_rapidapi_client
 from dotenv import load_dotenv
-from models import FactCheckRequest, FactCheckResponse, ExaAnswerResponse
+from models import (
+    FactCheckRequest, FactCheckResponse, ExaAnswerResponse,
+    FactCheckBatchItem, FactCheckError,
+)
 from exa_service import ExaService
+from fact_check_cache import FactCheckCache, normalize_claim
+from claim_index import ClaimIndex
+from video_store import INCOMING_DIR, VideoStore, StoredVideo
+from file_responses import RangeFileResponse
+from projection import VIEW_PATTERN, is_projected, parse_fields, project_fact_check
+from compression import CompressionMiddleware
+from fast_json import FastJSONResponse, dumps
+import metrics
+import tracing
+from tracing import TracingMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
-import traceback, logging
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+import traceback, logging, re, time, hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 app = FastAPI(title="Backend Research API", version="1.0.0")
 
@@ -21,7 +39,7 @@ RAPIDAPI_HOST = settings.RAPIDAPI_HOST
 RAPIDAPI_KEY = settings.RAPIDAPI_KEY
 RAPIDAPI_HOST = settings.RAPIDAPI_HOST
 
-VIDEO_STORAGE_DIR = os.path.join(os.path.dirname(__file__), "downloaded_videos")
+VIDEO_STORAGE_DIR = settings.VIDEO_STORAGE_DIR
 os.makedirs(VIDEO_STORAGE_DIR, exist_ok=True)
 
 # Mount the directory as a static files path. This makes files publicly accessible.
@@ -30,10 +48,58 @@ app.mount("/videos", StaticFiles(directory=VIDEO_STORAGE_DIR), name="videos")
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open one keep-alive pool per upstream for the lifetime of the app."""
+    app.state.exa_client = build_exa_client(settings)
+    app.state.exa_resilience = build_exa_resilience(settings)
+    app.state.rapidapi_client = build_rapidapi_client(settings)
+    app.state.fact_check_cache = (
+        FactCheckCache(
+            path=settings.FACTCHECK_CACHE_PATH,
+            ttl_seconds=settings.FACTCHECK_CACHE_TTL,
+            memory_size=settings.FACTCHECK_CACHE_MEMORY_SIZE,
+            disk_size=settings.FACTCHECK_CACHE_DISK_SIZE,
+        )
+        if settings.FACTCHECK_CACHE_ENABLED
+        else None
+    )
+    app.state.fact_check_flight = SingleFlight()
+    metrics.FACTCHECK_IN_FLIGHT.set_function(lambda: app.state.fact_check_flight.stats()["inFlight"])
+    metrics.EXA_CIRCUIT_OPEN.set_function(lambda: app.state.exa_resilience.breaker.state != "closed")
+    app.state.claim_index = None
+    if app.state.fact_check_cache is not None and settings.FACTCHECK_SIMILARITY_ENABLED:
+        app.state.claim_index = ClaimIndex(
+            path=settings.FACTCHECK_CACHE_PATH,
+            threshold=settings.FACTCHECK_SIMILARITY_THRESHOLD,
+            num_perm=settings.FACTCHECK_SIMILARITY_NUM_PERM,
+        )
+        await asyncio.to_thread(app.state.claim_index.load)
+    app.state.video_store = VideoStore(
+        root=VIDEO_STORAGE_DIR,
+        index_path=settings.VIDEO_STORE_INDEX_PATH,
+        max_bytes=settings.VIDEO_STORE_MAX_BYTES,
+    )
+    await asyncio.to_thread(app.state.video_store.remove_stale_incoming, settings.VIDEO_STORE_INCOMING_MAX_AGE)
+    await app.state.video_store.gc()
+    try:
+        yield
+    finally:
+        await app.state.exa_client.aclose()
+        await app.state.rapidapi_client.aclose()
+        if app.state.fact_check_cache is not None:
+            app.state.fact_check_cache.close()
+        if app.state.claim_index is not None:
+            app.state.claim_index.close()
+        app.state.video_store.close()
+
+
 app = FastAPI(
     title="Backend Research API",
     version="1.0.0",
-    description="API for fact-checking claims using Exa search"
+    description="API for fact-checking claims using Exa search",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -45,68 +111,96 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middleware to handle HEAD requests
-@app.middleware("http")
-async def head_request_middleware(request: Request, call_next):
-    if request.method == "HEAD":
-        # Convert HEAD to GET and return only headers
-        request.scope["method"] = "GET"
-        response = await call_next(request)
-        return Response(status_code=response.status_code, headers=response.headers)
-    return await call_next(request)
-
-# Initialize Exa service
-def get_exa_service() -> ExaService:
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        # streamed events and (ranged) video bytes go out as-is
+        exclude_prefixes=("/fact-check/stream", "/videos/"),
+    )
+
+# Outermost, so Server-Timing covers compression too; X-Trace-Id from the embedding service is reused
+app.add_middleware(
+    TracingMiddleware,
+    service="research",
+    server_timing=settings.SERVER_TIMING_ENABLED,
+    log_path=settings.TRACE_LOG_PATH,
+    log_min_ms=settings.TRACE_LOG_MIN_MS,
+    profile_slow_ms=settings.PROFILE_SLOW_MS,
+    profile_dir=settings.PROFILE_DIR,
+    profile_sample_rate=settings.PROFILE_SAMPLE_RATE,
+)
+
+# Initialize Exa service on top of the shared Exa connection pool
+def get_exa_service(request: Request) -> ExaService:
     try:
-        return ExaService()
+        return ExaService(
+            client=request.app.state.exa_client,
+            cache=request.app.state.fact_check_cache,
+            claim_index=request.app.state.claim_index,
+            inflight=request.app.state.fact_check_flight,
+            resilience=request.app.state.exa_resilience,
+        )
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# HEAD is registered per route: cheap routes share the GET handler (the server
+# drops the body), expensive ones answer from metadata or cache without upstream calls.
 @app.get("/health")
+@app.head("/health", include_in_schema=False)
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "API is running"}
 
 @app.get("/")
+@app.head("/", include_in_schema=False)
 def root():
     """Root endpoint"""
     return {"message": "Backend Research API", "version": "1.0.0"}
 
+def _truthy_header(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in {"1", "true", "yes"}
+
 @app.post("/fact-check", response_model=FactCheckResponse)
 async def fact_check_claim(
     request: FactCheckRequest,
+    response: Response,
     exa_service: ExaService = Depends(get_exa_service),
+    x_cache_bypass: Optional[str] = Header(None),
+    view: str = Query("full", pattern=VIEW_PATTERN),
+    fields: Optional[str] = None,
 ):
+    """
+    Send `X-Cache-Bypass: 1` to skip the cache and force a fresh Exa call.
+    The `X-Cache` response header reports HIT, SIMILAR (near-duplicate claim),
+    MISS or BYPASS.
+
+    `view=compact` drops `exaResponse` (a duplicate of `sources`) and truncates
+    source text; `fields=title,truthfulnessScore` keeps only the listed fields.
+    """
     try:
-        result = await exa_service.fact_check_claim(request.claim)
-
-        # Case 1: service returned a Pydantic model
-        if isinstance(result, FactCheckResponse):
-            # don't mutate; create an updated copy
-            return result.copy(update={
-                "startSec": request.startSec,
-                "endSec": request.endSec,
-            })
-
-        # Case 2: service returned a dict-like
-        if isinstance(result, dict):
-            # make a new dict with required fields added/overridden
-            merged = {**result, "startSec": request.startSec, "endSec": request.endSec}
-            return FactCheckResponse(**merged)
-
-        # Case 3: unknown object; try to coerce
-        coerced = {
-            "startSec": request.startSec,
-            "endSec": request.endSec,
-            "title": getattr(result, "title", request.claim[:50]),
-            "description": getattr(result, "description", request.claim),
-            "truthfulnessScore": int(getattr(result, "truthfulnessScore", 3)),
-            "response": getattr(result, "response", "No detailed response provided."),
-            "sources": getattr(result, "sources", []),
-            "exaResponse": getattr(result, "exaResponse", None),
-        }
-        return FactCheckResponse(**coerced)
+        refresh = _truthy_header(x_cache_bypass)
+        result = await exa_service.fact_check_claim(request.claim, refresh=refresh)
+        if exa_service.cache is not None:
+            if refresh:
+                response.headers["X-Cache"] = "BYPASS"
+            elif getattr(result, "similarity", None) is not None:
+                response.headers["X-Cache"] = "SIMILAR"
+            else:
+                response.headers["X-Cache"] = "HIT" if getattr(result, "cached", False) else "MISS"
+        result = _with_clip_span(result, request)
+        field_set = parse_fields(fields)
+        with tracing.span("encode"):
+            if is_projected(view, field_set):
+                return FastJSONResponse(
+                    project_fact_check(result.model_dump(mode="json"), view, field_set,
+                                       settings.FACTCHECK_COMPACT_TEXT_CHARS),
+                    headers=dict(response.headers),
+                )
+            # Serialize in pydantic-core directly instead of letting FastAPI re-validate the response_model
+            return Response(content=result.model_dump_json(), media_type="application/json",
+                            headers=dict(response.headers))
 
     except HTTPException as he:
         # bubble up original detail/status
@@ -117,7 +211,162 @@ async def fact_check_claim(
             detail=f"Failed to fact-check claim: {e}",
         )
 
+def _with_clip_span(result, request: FactCheckRequest) -> FactCheckResponse:
+    """Attach the request's startSec/endSec to whatever the service returned."""
+    # Case 1: service returned a Pydantic model
+    if isinstance(result, FactCheckResponse):
+        # don't mutate; create an updated copy
+        return result.copy(update={
+            "startSec": request.startSec,
+            "endSec": request.endSec,
+        })
+
+    # Case 2: service returned a dict-like
+    if isinstance(result, dict):
+        # make a new dict with required fields added/overridden
+        merged = {**result, "startSec": request.startSec, "endSec": request.endSec}
+        return FactCheckResponse(**merged)
+
+    # Case 3: unknown object; try to coerce
+    coerced = {
+        "startSec": request.startSec,
+        "endSec": request.endSec,
+        "title": getattr(result, "title", request.claim[:50]),
+        "description": getattr(result, "description", request.claim),
+        "truthfulnessScore": int(getattr(result, "truthfulnessScore", 3)),
+        "response": getattr(result, "response", "No detailed response provided."),
+        "sources": getattr(result, "sources", []),
+        "exaResponse": getattr(result, "exaResponse", None),
+    }
+    return FactCheckResponse(**coerced)
+
+@app.post("/fact-check/batch", response_model=List[FactCheckBatchItem])
+async def fact_check_batch(
+    items: List[FactCheckRequest],
+    exa_service: ExaService = Depends(get_exa_service),
+    x_cache_bypass: Optional[str] = Header(None),
+):
+    """
+    Fact-check a list of {startSec, endSec, claim} in one round trip.
+
+    Claims run concurrently (at most FACTCHECK_BATCH_CONCURRENCY at a time) and
+    identical claims are only checked once. Results come back in input order;
+    a failed item carries an `error` instead of a `result`.
+    """
+    if len(items) > settings.FACTCHECK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"batch too large: {len(items)} items (max {settings.FACTCHECK_BATCH_MAX_ITEMS})",
+        )
+
+    refresh = _truthy_header(x_cache_bypass)
+    semaphore = asyncio.Semaphore(max(1, settings.FACTCHECK_BATCH_CONCURRENCY))
+
+    async def check(claim: str):
+        async with semaphore:
+            return await exa_service.fact_check_claim(claim, refresh=refresh)
+
+    tasks: Dict[str, asyncio.Task] = {}
+    for item in items:
+        key = normalize_claim(item.claim)
+        if key not in tasks:
+            tasks[key] = asyncio.ensure_future(check(item.claim))
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    results: List[FactCheckBatchItem] = []
+    for index, item in enumerate(items):
+        task = tasks[normalize_claim(item.claim)]
+        error = task.exception()
+        try:
+            if error is None:
+                results.append(FactCheckBatchItem(index=index, result=_with_clip_span(task.result(), item)))
+                continue
+        except Exception as e:
+            error = e
+        if isinstance(error, HTTPException):
+            status_code, detail = error.status_code, str(error.detail)
+        else:
+            status_code, detail = 500, f"Failed to fact-check claim: {error}"
+        results.append(FactCheckBatchItem(index=index, error=FactCheckError(status=status_code, detail=detail)))
+    return Response(content=_BATCH_ITEMS.dump_json(results), media_type="application/json")
+
+_BATCH_ITEMS = TypeAdapter(List[FactCheckBatchItem])
+
+def _stream_event(event: str, data: dict, sse: bool) -> bytes:
+    if sse:
+        return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+    return dumps({"event": event, **data}) + b"\n"
+
+@app.post("/fact-check/stream")
+async def fact_check_claim_stream(
+    request: FactCheckRequest,
+    http_request: Request,
+    exa_service: ExaService = Depends(get_exa_service),
+    x_cache_bypass: Optional[str] = Header(None),
+):
+    """
+    Streaming variant of /fact-check, fed by Exa's streamed answer.
+
+    Emits newline-delimited JSON (or Server-Sent Events when the client sends
+    `Accept: text/event-stream`):
+      {"event": "verdict", "title": ..., "truthfulnessScore": n}   as soon as both are parsed
+      {"event": "field", "name": "description", "value": ...}      each field as it completes
+      {"event": "analysis", "delta": "..."}                         analysis text as it arrives
+      {"event": "result", "result": {...}}                          the full FactCheckResponse, last
+      {"event": "error", "status": n, "detail": "..."}              instead of a result on failure
+    Cache hits skip straight to the result.
+    """
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+    refresh = _truthy_header(x_cache_bypass)
+
+    async def events():
+        try:
+            async for event in exa_service.fact_check_claim_stream(request.claim, refresh=refresh):
+                name = event.pop("event")
+                if name == "result":
+                    event["result"] = _with_clip_span(event["result"], request).model_dump()
+                yield _stream_event(name, event, sse)
+        except HTTPException as he:
+            yield _stream_event("error", {"status": he.status_code, "detail": str(he.detail)}, sse)
+        except Exception as e:
+            yield _stream_event("error", {"status": 500, "detail": f"Failed to fact-check claim: {e}"}, sse)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/fact-check/cache/stats")
+def fact_check_cache_stats(request: Request):
+    """Hit/miss counters and entry counts for the fact-check cache, plus in-flight coalescing counters"""
+    cache: Optional[FactCheckCache] = request.app.state.fact_check_cache
+    inflight = request.app.state.fact_check_flight.stats()
+    if cache is None:
+        return {"enabled": False, "inflight": inflight}
+    claim_index: Optional[ClaimIndex] = request.app.state.claim_index
+    return {
+        "enabled": True,
+        **cache.stats(),
+        "similarity": claim_index.stats() if claim_index is not None else None,
+        "inflight": inflight,
+    }
+
+@app.get("/fact-check/upstream")
+def fact_check_upstream(request: Request):
+    """Exa circuit breaker state and retry/hedging counters"""
+    return request.app.state.exa_resilience.stats()
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus exposition: upstream latency, Exa cost, fact-check cache outcomes"""
+    body, content_type = metrics.render()
+    if body is None:
+        return Response("prometheus_client is not installed\n", status_code=503, media_type=content_type)
+    return Response(body, media_type=content_type)
+
 @app.get("/config")
+@app.head("/config", include_in_schema=False)
 def get_config():
     """Get API configuration status"""
     has_exa_key = bool(os.getenv("EXA_API_KEY"))
@@ -127,23 +376,6 @@ def get_config():
     }
 
 
-# class IngestRequest(BaseModel):
-#     youtube_url: HttpUrl
-#     quality: int = 720
-
-# @app.post("/videos")
-# def create_video(req: IngestRequest):
-#     try:
-#         out = download_to_disk(
-#             youtube_url=str(req.youtube_url),
-#             out_path=f"videos/demo/video_{req.quality}p.mp4",
-#             quality=req.quality,
-#             rapidapi_key=os.environ["RAPIDAPI_KEY"]
-#         )
-#         return {"status": "ok", "path": out["path"]}
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=str(e))
-
 class DownloadRequest(BaseModel):
     url: HttpUrl
     format: str = "mp4"
@@ -157,6 +389,114 @@ class DownloadRequest(BaseModel):
             raise ValueError(f"format must be one of {sorted(allowed)}")
         return v.lower()
 
+class BatchDownloadRequest(BaseModel):
+    urls: List[HttpUrl]
+    format: str = "mp4"
+    quality: int = 720
+
+    @field_validator("format")
+    @classmethod
+    def validate_format(cls, v: str) -> str:
+        return DownloadRequest.validate_format(v)
+
+def _source_key(url: str, fmt: str, quality: int) -> str:
+    """Video store source key for a URL at a given format/quality."""
+    return f"{url}#{fmt}@{quality}"
+
+def _incoming_path(source: str, fmt: str) -> str:
+    # Final download path per source; ytdl keys the .part file on the job's file URL next to it
+    return os.path.join(VIDEO_STORAGE_DIR, INCOMING_DIR, hashlib.sha1(source.encode("utf-8")).hexdigest() + "." + fmt)
+
+@app.post("/download/batch")
+async def download_batch(req: BatchDownloadRequest):
+    """
+    Run start/poll/fetch for several URLs server-side, DOWNLOAD_CONCURRENCY at a time,
+    and move each finished file into the video store. URLs already stored are skipped,
+    repeated URLs are downloaded once, and each download joins a concurrent /ingest
+    of the same source instead of racing it for the same .part file.
+    """
+    if len(req.urls) > settings.DOWNLOAD_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"at most {settings.DOWNLOAD_BATCH_MAX_ITEMS} urls per batch")
+
+    store: VideoStore = app.state.video_store
+    results: List[Optional[dict]] = [None] * len(req.urls)
+    # source -> (url, indices of every occurrence in req.urls)
+    pending: Dict[str, Tuple[str, List[int]]] = {}
+    for i, url in enumerate(map(str, req.urls)):
+        source = _source_key(url, req.format, req.quality)
+        if source in pending:
+            pending[source][1].append(i)
+            continue
+        stored = await store.lookup_source(source)
+        if stored is not None:
+            results[i] = {"url": url, **_stored_video_response(stored)}
+        else:
+            pending[source] = (url, [i])
+
+    sem = asyncio.Semaphore(max(1, settings.DOWNLOAD_CONCURRENCY))
+
+    async def one(source: str, url: str) -> dict:
+        async with sem:
+            try:
+                stored, _ = await ingest_flight.do(
+                    source, lambda: _ingest_source(url, source, req.format, req.quality))
+            except Exception as e:
+                return {"url": url, "status": "error", "error": str(e) or type(e).__name__}
+        return {"url": url, **_stored_video_response(stored)}
+
+    outcomes = await asyncio.gather(*(one(source, url) for source, (url, _) in pending.items()))
+    for (_, indices), out in zip(pending.values(), outcomes):
+        for i in indices:
+            results[i] = out
+    return {"status": "ok", "results": results}
+
+# Collapses concurrent /ingest and /download/batch work for the same (url, format, quality) into one upstream job
+ingest_flight = SingleFlight()
+
+async def _ingest_source(url: str, source: str, fmt: str, quality: int) -> StoredVideo:
+    """Download `url` through RapidAPI into .incoming/ and move it into the video store."""
+    out = await download_to_disk_async(
+        url, _incoming_path(source, fmt), quality, fmt=fmt,
+        client=app.state.rapidapi_client,
+        base_url=settings.rapidapi_base_url,
+        headers=BROWSER_HEADERS,
+        deadline=settings.DOWNLOAD_POLL_DEADLINE,
+    )
+    return await app.state.video_store.ingest_file(out["path"], "." + fmt, source=source)
+
+@app.post("/ingest")
+async def ingest(req: DownloadRequest):
+    """
+    One-shot download: start the RapidAPI job, poll it and store the file server-side,
+    then return the permanent video URLs. Replaces the browser-driven
+    /download -> /status -> /downloadFile sequence.
+
+    Upstream failures (HTTP errors, connection errors, unreadable responses) are
+    502; a job still not ready after DOWNLOAD_POLL_DEADLINE is 504.
+    """
+    url = str(req.url)
+    source = _source_key(url, req.format, req.quality)
+    store: VideoStore = app.state.video_store
+    stored = await store.lookup_source(source)
+    if stored is not None:
+        return {**_stored_video_response(stored), "coalesced": False}
+
+    try:
+        stored, shared = await ingest_flight.do(source, lambda: _ingest_source(url, source, req.format, req.quality))
+    except JobTimeout as e:
+        raise HTTPException(status_code=504, detail={"message": str(e)})
+    except DownloadError as e:
+        raise HTTPException(status_code=502, detail={"message": str(e)})
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=502, detail={
+            "upstream_status": e.response.status_code,
+            "message": e.response.text[:300],
+        })
+    except (httpx.HTTPError, ValueError) as e:
+        # Connection failures, time-outs and unparseable upstream bodies
+        raise HTTPException(status_code=502, detail={"message": f"{type(e).__name__}: {e}"})
+    return {**_stored_video_response(stored), "coalesced": shared}
+
 @app.post("/video_info")
 async def video_info(req: DownloadRequest):
     data = await post_rapidapi("/video_info", {"url": str(req.url)})
@@ -171,76 +511,176 @@ async def download(req: DownloadRequest):
     })
     if "jobId" not in data:
         raise HTTPException(status_code=502, detail={"message": "invalid response from upstream", "data": data})
+    _job_sources[str(data["jobId"])] = (str(req.url), req.format, req.quality)
+    if len(_job_sources) > 4096:
+        _job_sources.popitem(last=False)
     return {"status": "ok", "jobId": data["jobId"]}
 
+# jobId -> (url, format, quality) for jobs started by this process through /download, so
+# /downloadFile stores the result under the same source key as /ingest (oldest dropped first)
+_job_sources: "OrderedDict[str, Tuple[str, str, int]]" = OrderedDict()
+
+# jobId -> (fetched_at, etag, data), least recently used first; lets tight polling skip RapidAPI.
+# Expired entries stay until the LRU cap drops them so HEAD can still answer from them.
+_status_cache: "OrderedDict[str, Tuple[float, str, dict]]" = OrderedDict()
+
+def _cached_status(jobId: str, fresh: bool = True) -> Optional[Tuple[float, str, dict]]:
+    entry = _status_cache.get(jobId)
+    if entry is None or (fresh and time.monotonic() - entry[0] >= settings.STATUS_CACHE_TTL):
+        return None
+    _status_cache.move_to_end(jobId)
+    return entry
+
+def _status_headers(entry: Tuple[float, str, dict], cache: str) -> dict:
+    fetched_at, etag, _ = entry
+    return {
+        "ETag": etag,
+        "Age": str(int(time.monotonic() - fetched_at)),
+        "Cache-Control": f"max-age={int(settings.STATUS_CACHE_TTL)}",
+        "X-Cache": cache,
+    }
+
 @app.get("/status/{jobId}")
 async def status(jobId: str):
+    """RapidAPI job status, reused for STATUS_CACHE_TTL."""
+    entry = _cached_status(jobId)
+    if entry is not None:
+        return JSONResponse({"status": "ok", "data": entry[2]}, headers=_status_headers(entry, "HIT"))
     data = await get_rapidapi(f"/status/{jobId}")
-    return {"status": "ok", "data": data}
-
-@app.get("/downloadFile/{jobId}/{filename}")
-async def download_file(jobId: str, filename: str):
+    etag = '"%s"' % hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    entry = (time.monotonic(), etag, data)
+    _status_cache[jobId] = entry
+    _status_cache.move_to_end(jobId)
+    while len(_status_cache) > settings.STATUS_CACHE_MAX_ENTRIES:
+        _status_cache.popitem(last=False)
+    return JSONResponse({"status": "ok", "data": data}, headers=_status_headers(entry, "MISS"))
+
+@app.head("/status/{jobId}", include_in_schema=False)
+async def status_head(jobId: str):
     """
-    Download from RapidAPI and return permanent URLs
+    Headers of the last GET for this job, never an upstream call: X-Cache is HIT
+    while fresh, STALE past STATUS_CACHE_TTL (Age > max-age), and MISS with no
+    ETag when no GET has been cached for the job.
     """
-    path = f"/file/{jobId}/{filename}"
-    url = f"https://{settings.RAPIDAPI_HOST}{path}"
-
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.get(url, headers=BROWSER_HEADERS)
+    entry = _cached_status(jobId, fresh=False)
+    if entry is None:
+        return Response(headers={"Cache-Control": "no-cache", "X-Cache": "MISS"}, media_type="application/json")
+    fresh = time.monotonic() - entry[0] < settings.STATUS_CACHE_TTL
+    return Response(headers=_status_headers(entry, "HIT" if fresh else "STALE"), media_type="application/json")
 
-    if response.status_code != 200:
-        # Your error handling...
-        pass
-
-    # Generate unique filename
-    file_extension = os.path.splitext(filename)[1] or ".mp4"
-    unique_filename = f"{jobId}_{uuid.uuid4().hex[:8]}{file_extension}"
-    local_filepath = os.path.join(VIDEO_STORAGE_DIR, unique_filename)
+@app.get("/downloadFile/{jobId}/{filename}")
+@app.head("/downloadFile/{jobId}/{filename}", include_in_schema=False)
+async def download_file(jobId: str, filename: str, request: Request, sourceUrl: Optional[str] = None):
+    """
+    Download from RapidAPI and return permanent URLs.
 
-    # Save file permanently
-    with open(local_filepath, 'wb') as f:
-        f.write(response.content)
+    Files are stored by content hash. A job started through /download on this
+    process is keyed like /ingest (url, format, quality), so a repeat request for
+    the same video returns the stored file without downloading. `sourceUrl` is
+    only accepted as a cross-check: if it doesn't match the job's URL, or the job
+    is unknown here, the file is keyed by the RapidAPI job/file pair instead.
 
+    HEAD answers 200 like GET but never downloads; X-Video-Filename and ETag are
+    only present when the file is already stored.
+    """
+    store: VideoStore = app.state.video_store
+    job = _job_sources.get(jobId)
+    if job is not None and sourceUrl in (None, job[0]):
+        source = _source_key(*job)
+    else:
+        source = f"rapidapi:{jobId}/{filename}"
+    stored = await store.lookup_source(source)
+    if request.method == "HEAD":
+        if stored is None:
+            return Response(media_type="application/json")
+        return Response(media_type="application/json",
+                        headers={"X-Video-Filename": stored.filename, "ETag": f'"{stored.sha256}"'})
+    if stored is None:
+        path = f"/file/{jobId}/{filename}"
+        url = f"{settings.rapidapi_base_url}{path}"
+        file_extension = os.path.splitext(filename)[1] or ".mp4"
+
+        # Stream to a temp file in chunks while hashing, then move it into the store
+        client: httpx.AsyncClient = app.state.rapidapi_client
+        with tracing.span("rapidapi.file"):
+            async with client.stream("GET", url, headers=BROWSER_HEADERS, timeout=settings.RAPIDAPI_FILE_TIMEOUT) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise HTTPException(status_code=502, detail={
+                        "upstream_status": response.status_code,
+                        "message": body[:300].decode("utf-8", errors="replace"),
+                    })
+                stored = await store.ingest_stream(
+                    response.aiter_bytes(settings.DOWNLOAD_CHUNK_SIZE), file_extension, source=source,
+                )
+
+    return _stored_video_response(stored)
+
+def _stored_video_response(stored: StoredVideo) -> dict:
     # Generate permanent URLs
-    video_url = f"https://neda-pericardial-unanachronously.ngrok-free.dev/videos/{unique_filename}"
-    embed_url = f"https://neda-pericardial-unanachronously.ngrok-free.dev/embed/{unique_filename}"
+    video_url = f"{settings.PUBLIC_BASE_URL}/videos/{stored.filename}"
+    embed_url = f"{settings.PUBLIC_BASE_URL}/embed/{stored.filename}"
 
     return {
         "status": "ok",
         "direct_video_url": video_url,
         "embed_url": embed_url,         # Web page with embedded video; use for TwelveLabs
-        "filename": unique_filename,
+        "filename": stored.filename,
+        "sha256": stored.sha256,
+        "deduplicated": stored.deduplicated,
         "message": "Video permanently stored and available at the provided URLs"
     }
 
+@app.get("/video-store/stats")
+def video_store_stats(request: Request):
+    """Blob count and size of the content-addressed video store, plus /ingest coalescing counters"""
+    return {**request.app.state.video_store.stats(), "ingest": ingest_flight.stats()}
+
 @app.get("/videos/{filename}")
-async def get_video(filename: str):
+@app.head("/videos/{filename}", include_in_schema=False)
+async def get_video(filename: str, request: Request):
     """
     Stream a video file for playback in the browser.
+    Supports Range/If-Range (206, multipart ranges) and ETag/Last-Modified
+    revalidation (304) so seeking and repeat loads don't re-stream the file.
     """
-    local_filepath = os.path.join(VIDEO_STORAGE_DIR, filename)
+    local_filepath = os.path.join(VIDEO_STORAGE_DIR, os.path.basename(filename))
+    if os.path.basename(filename).startswith("."):
+        # .incoming/ and other hidden entries hold partial downloads, never served
+        raise HTTPException(status_code=404, detail="Video file not found")
 
-    if not os.path.exists(local_filepath):
+    try:
+        stat = await asyncio.to_thread(os.stat, local_filepath)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Video file not found")
+    if request.method == "GET":
+        await app.state.video_store.touch(filename)
+
+    # Content-addressed files are named after their SHA-256, which makes a perfect strong ETag
+    stem = os.path.splitext(filename)[0]
+    content_hash = stem if re.fullmatch(r"[0-9a-f]{64}", stem) else None
 
-    return FileResponse(
+    return RangeFileResponse(
+        request,
         path=local_filepath,
         media_type="video/mp4",
-        filename=filename,
+        stat=stat,
+        content_hash=content_hash,
         # These headers make it embeddable and permanent
         headers={
             "Content-Disposition": f'inline; filename="{filename}"',
-            "Cache-Control": "public, max-age=31536000"  # Cache for 1 year
+            "Cache-Control": "public, max-age=31536000, immutable" if content_hash
+            else "public, max-age=31536000"  # Cache for 1 year
         }
     )
 
 @app.get("/embed/{filename}", response_class=HTMLResponse)
+@app.head("/embed/{filename}", include_in_schema=False)
 async def embed_video(filename: str):
     """
     Return an HTML page with the video embedded
     """
-    video_url = f"https://neda-pericardial-unanachronously.ngrok-free.dev/videos/{filename}"
+    video_url = f"{settings.PUBLIC_BASE_URL}/videos/{filename}"
 
     html_content = f"""
     <!DOCTYPE html>
@@ -282,41 +722,20 @@ BROWSER_HEADERS = {
 }
 
 async def post_rapidapi(path: str, payload: dict):
-    url = f"https://{settings.RAPIDAPI_HOST}{path}"
-    async with httpx.AsyncClient(timeout=60.0, http2=False) as client:
-        r = await client.post(url, headers=BROWSER_HEADERS, json=payload)
-    text = r.text
-    try:
-        data = r.json()
-        if isinstance(data, str) and data.strip().startswith("{"):
-            data = json.loads(data)
-    except ValueError:
-        data = {"raw": text}
-
-    if r.status_code >= 400 or ("error" in data and "Automated requests" in (data.get("error") or "")):
-        raise HTTPException(status_code=502, detail={
-            "upstream_status": r.status_code,
-            "message": data.get("error") or data.get("message") or text[:300],
-        })
-    return data
+    url = f"{settings.rapidapi_base_url}{path}"
+    client: httpx.AsyncClient = app.state.rapidapi_client
+    r = await client.post(url, headers=BROWSER_HEADERS, json=payload)
+    return _rapidapi_data(r)
 
 async def get_rapidapi(path: str):
-    url = f"https://{settings.RAPIDAPI_HOST}{path}"
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        # Use GET method instead of POST
-        r = await client.get(url, headers=BROWSER_HEADERS) # Note: 'GET' here
-    # ... (keep the same response handling logic as your post_rapidapi function)
-    text = r.text
-    try:
-        data = r.json()
-        if isinstance(data, str) and data.strip().startswith("{"):
-            data = json.loads(data)
-    except ValueError:
-        data = {"raw": text}
-
-    if r.status_code >= 400:
-        raise HTTPException(status_code=502, detail={
-            "upstream_status": r.status_code,
-            "message": data.get("error") or data.get("message") or text[:300],
-        })
+    url = f"{settings.rapidapi_base_url}{path}"
+    client: httpx.AsyncClient = app.state.rapidapi_client
+    r = await client.get(url, headers=BROWSER_HEADERS)
+    return _rapidapi_data(r)
+
+def _rapidapi_data(r: httpx.Response) -> dict:
+    data = parse_response(r)
+    error = upstream_error(r, data)
+    if error is not None:
+        raise HTTPException(status_code=502, detail={"upstream_status": r.status_code, "message": error})
     return data
@@ -0,0 +1,125 @@
+"""
+Prometheus metrics for backend-research, served at GET /metrics.
+
+Every upstream HTTP call made through the pooled clients (see http_clients.py)
+is timed by `InstrumentedTransport` (time to response headers, labelled by
+upstream, first path segment and outcome). Exa dollar cost, parse failures
+and cache outcomes are counted by ExaService; state gauges (coalesced claims
+in flight, breaker state) read app state when scraped.
+
+Metric names are prefixed `research_` so they never clash with the embedding
+service's, which can load this module in-process. With `prometheus_client`
+not installed every metric is a no-op and /metrics answers 503.
+"""
+import asyncio
+import time
+from typing import Callable, Optional, Tuple
+
+import httpx
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        pass
+
+
+# Upstream latencies run from ~50ms (cache-warm Exa) to minutes (RapidAPI jobs)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+if PROMETHEUS_AVAILABLE:
+    # Own registry: a re-import (the embedding service loading this module) starts clean
+    REGISTRY = CollectorRegistry()
+    UPSTREAM_SECONDS = Histogram(
+        "research_upstream_request_seconds", "Upstream HTTP request latency (to response headers)",
+        ["upstream", "operation", "outcome"], buckets=LATENCY_BUCKETS, registry=REGISTRY,
+    )
+    UPSTREAM_IN_FLIGHT = Gauge(
+        "research_upstream_in_flight", "Upstream HTTP requests currently waiting for a response",
+        ["upstream"], registry=REGISTRY,
+    )
+    EXA_COST_DOLLARS = Counter(
+        "research_exa_cost_dollars", "Exa costDollars.total summed over every answer received", registry=REGISTRY,
+    )
+    FACTCHECK_PARSE_FAILURES = Counter(
+        "research_factcheck_parse_failures", "Exa answers that didn't match the TITLE/DESCRIPTION/SCORE/ANALYSIS format",
+        registry=REGISTRY,
+    )
+    FACTCHECK_LOOKUPS = Counter(
+        "research_factcheck_lookups", "Fact-check requests by how they were served (hit, similar, coalesced, miss, bypass)",
+        ["result"], registry=REGISTRY,
+    )
+    FACTCHECK_IN_FLIGHT = Gauge(
+        "research_factcheck_in_flight_claims", "Distinct claims currently being checked upstream", registry=REGISTRY,
+    )
+    EXA_CIRCUIT_OPEN = Gauge(
+        "research_exa_circuit_open", "1 while the Exa circuit breaker is open or half-open", registry=REGISTRY,
+    )
+else:
+    REGISTRY = None
+    UPSTREAM_SECONDS = UPSTREAM_IN_FLIGHT = EXA_COST_DOLLARS = FACTCHECK_PARSE_FAILURES = _NoopMetric()
+    FACTCHECK_LOOKUPS = FACTCHECK_IN_FLIGHT = EXA_CIRCUIT_OPEN = _NoopMetric()
+
+
+def render() -> Tuple[Optional[bytes], str]:
+    """(exposition body, content type); body is None without prometheus_client."""
+    if not PROMETHEUS_AVAILABLE:
+        return None, "text/plain"
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def record_exa_cost(cost) -> None:
+    """Add an ExaAnswerResponse.costDollars (may be None) to the running total."""
+    if cost is not None and cost.total:
+        EXA_COST_DOLLARS.inc(cost.total)
+
+
+def _operation(path: str) -> str:
+    # First path segment only: the rest carries job ids and filenames
+    return "/" + path.lstrip("/").split("/", 1)[0]
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport to time each request and track how many are in flight."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: str):
+        self.transport = transport
+        self.upstream = upstream
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        in_flight = UPSTREAM_IN_FLIGHT.labels(self.upstream)
+        in_flight.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.transport.handle_async_request(request)
+            outcome = f"{response.status_code // 100}xx"
+            return response
+        except asyncio.CancelledError:
+            outcome = "cancelled"  # e.g. the losing half of a hedged Exa call
+            raise
+        finally:
+            in_flight.dec()
+            UPSTREAM_SECONDS.labels(self.upstream, _operation(request.url.path), outcome).observe(
+                time.perf_counter() - started
+            )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
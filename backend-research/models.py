@@ -86,3 +86,28 @@ class FactCheckResponse(BaseModel):
         None,
         description="Full Exa API response for reference"
     )
+    cached: bool = Field(
+        False,
+        description="True when the result was served from the fact-check cache"
+    )
+    similarity: Optional[float] = Field(
+        None,
+        description="Estimated similarity to matchedClaim when reused from a near-duplicate claim",
+        ge=0,
+        le=1
+    )
+    matchedClaim: Optional[str] = Field(
+        None,
+        description="The normalized prior claim whose fact-check was reused"
+    )
+
+
+class FactCheckError(BaseModel):
+    status: int = Field(..., description="HTTP status the single-claim endpoint would have returned")
+    detail: str = Field(..., description="Error message")
+
+
+class FactCheckBatchItem(BaseModel):
+    index: int = Field(..., description="Position of the item in the request list", ge=0)
+    result: Optional[FactCheckResponse] = None
+    error: Optional[FactCheckError] = None
@@ -0,0 +1,40 @@
+"""
+Trimmed views of FactCheckResponse payloads.
+
+A full response carries `sources` and again `exaResponse.citations` (the same
+list), each with the full page `text`. `view=compact` drops `exaResponse` and
+truncates source text; `fields=a,b` keeps only the listed top-level fields.
+"""
+from typing import Any, Dict, Optional, Set
+
+VIEW_PATTERN = "^(full|compact)$"
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Set[str]]:
+    """'title, truthfulnessScore' -> {'title', 'truthfulnessScore'}; empty -> None."""
+    if not raw:
+        return None
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    return fields or None
+
+
+def is_projected(view: str, fields: Optional[Set[str]]) -> bool:
+    return view != "full" or bool(fields)
+
+
+def project_fact_check(data: Dict[str, Any], view: str = "full", fields: Optional[Set[str]] = None,
+                       text_chars: int = 280) -> Dict[str, Any]:
+    """Apply the view, then the field list, to a JSON-ready fact-check dict."""
+    if view == "compact":
+        data = {k: v for k, v in data.items() if k != "exaResponse"}
+        data["sources"] = [_compact_source(s, text_chars) for s in data.get("sources") or []]
+    if fields:
+        data = {k: v for k, v in data.items() if k in fields}
+    return data
+
+
+def _compact_source(source: Dict[str, Any], text_chars: int) -> Dict[str, Any]:
+    text = source.get("text")
+    if not text or len(text) <= text_chars:
+        return source
+    return {**source, "text": text[:text_chars].rstrip() + "…"}
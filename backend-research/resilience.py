@@ -0,0 +1,268 @@
+"""
+Retry, hedging and circuit breaking for upstream calls (Exa).
+
+`Resilience.call(send)` runs one logical upstream request:
+  - transient failures (connection errors, timeouts, 429/5xx) are retried
+    with full-jitter exponential backoff, within an overall time budget;
+    read timeouts are not retried by default, since the upstream already has
+    the request and may be processing (and billing) it;
+  - once enough latencies have been seen, an attempt still running after the
+    configured percentile gets a hedged duplicate and the first success wins;
+  - consecutive transient failures open a circuit breaker, which then fails
+    calls fast with CircuitOpenError until a single probe succeeds again.
+
+One instance is shared for the app lifetime (see main.py lifespan) so the
+latency window and breaker state cover every request. Streaming callers that
+can't be hedged use `acquire`/`record`/`retry_delay` directly.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """The upstream is marked unhealthy; the call was not attempted."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Errors worth retrying (and counted against the breaker): the request may succeed if repeated."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, httpx.TransportError)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    if isinstance(exc, httpx.HTTPStatusError):
+        value = exc.response.headers.get("retry-after", "")
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+    return None
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures -> half-open (one probe) after `reset_timeout`."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+            self._probing = False
+        if self._probing:
+            self.rejected += 1
+            return False
+        self._probing = True
+        return True
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """An allowed attempt ended without an outcome (cancelled); let another caller probe."""
+        if self.state == "half_open":
+            self._probing = False
+
+    def stats(self) -> Dict:
+        return {"state": self.state, "consecutiveFailures": self.failures, "trips": self.trips,
+                "rejected": self.rejected}
+
+
+class LatencyWindow:
+    """The last `size` successful attempt latencies, for the hedging threshold."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Resilience:
+    def __init__(
+        self,
+        name: str = "upstream",
+        retry_attempts: int = 3,
+        retry_base_delay: float = 0.25,
+        retry_max_delay: float = 4.0,
+        retry_budget: float = 45.0,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        hedge_min_delay: float = 1.0,
+        breaker_failures: int = 5,
+        breaker_reset: float = 30.0,
+        retry_read_timeouts: bool = False,
+    ):
+        self.name = name
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.retry_budget = retry_budget
+        self.retry_read_timeouts = retry_read_timeouts
+        # 0 disables hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset)
+        self.latency = LatencyWindow()
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    async def call(self, send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `send` (one upstream request, raising httpx errors on failure) with
+        retries, hedging and the breaker. Non-transient errors are raised as-is.
+        """
+        self.calls += 1
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.acquire()
+            try:
+                return await self._hedged(send)
+            except Exception as e:
+                delay = self.retry_delay(attempt, e, started)
+                if delay is None:
+                    self.failures += 1
+                    raise
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def acquire(self) -> None:
+        """Claim a slot from the breaker for one attempt; raises CircuitOpenError while it is open."""
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+
+    def record(self, exc: Optional[BaseException], latency: Optional[float] = None) -> None:
+        """Outcome of an acquired attempt: None = success, an exception = failure, cancelled = neither."""
+        if exc is None:
+            self.breaker.record_success()
+            if latency is not None:
+                self.latency.add(latency)
+        elif isinstance(exc, asyncio.CancelledError):
+            self.breaker.release()
+        elif is_transient(exc):
+            self.breaker.record_failure()
+        else:
+            # The upstream answered (e.g. 400/401): it is up, the request was wrong
+            self.breaker.record_success()
+
+    def retry_delay(self, attempt: int, exc: BaseException, started: float) -> Optional[float]:
+        """Backoff before the next attempt, or None if `exc` shouldn't be retried."""
+        if not is_transient(exc) or attempt >= self.retry_attempts:
+            return None
+        if isinstance(exc, httpx.ReadTimeout) and not self.retry_read_timeouts:
+            return None
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1)))
+        hinted = _retry_after(exc)
+        if hinted is not None:
+            delay = min(max(delay, hinted), self.retry_max_delay)
+        if time.monotonic() - started + delay > self.retry_budget:
+            return None
+        return delay
+
+    def hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile <= 0 or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile))
+
+    async def _attempt(self, send: Callable[[], Awaitable[T]]) -> T:
+        began = time.monotonic()
+        try:
+            result = await send()
+        except BaseException as e:
+            self.record(e)
+            raise
+        self.record(None, time.monotonic() - began)
+        return result
+
+    async def _hedged(self, send: Callable[[], Awaitable[T]]) -> T:
+        primary = asyncio.ensure_future(self._attempt(send))
+        pending = {primary}
+        try:
+            delay = self.hedge_delay()
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and self.breaker.allow():
+                self.hedges += 1
+                pending.add(asyncio.ensure_future(self._attempt(send)))
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "breaker": self.breaker.stats(),
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedgeWins": self.hedge_wins,
+            "failures": self.failures,
+            "hedgeDelay": self.hedge_delay(),
+            "latencySamples": len(self.latency),
+        }
@@ -1,8 +1,85 @@
 # settings.py
+import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     RAPIDAPI_KEY: str
     RAPIDAPI_HOST: str = "yt-video-audio-downloader-api.p.rapidapi.com"
+    RAPIDAPI_BASE_URL: str = ""  # defaults to https://RAPIDAPI_HOST; point at a local stand-in for benchmarks
+
+    # Upstream connection pools (one keep-alive pool per upstream, see http_clients.py)
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    EXA_BASE_URL: str = "https://api.exa.ai"
+    # Per attempt. With the retry budget, keep one call (all attempts) under the embedding
+    # service's FACTCHECK_TIMEOUT: worst case is about EXA_RETRY_BUDGET + EXA_TIMEOUT
+    EXA_TIMEOUT: float = 20.0
+    EXA_HTTP2: bool = True
+    EXA_MAX_CONNECTIONS: int = 50
+    EXA_MAX_KEEPALIVE: int = 20
+    # Exa retry / hedging / circuit breaker (see resilience.py)
+    EXA_RETRY_ATTEMPTS: int = 3  # attempts per call, including the first
+    EXA_RETRY_BASE_DELAY: float = 0.25
+    EXA_RETRY_MAX_DELAY: float = 4.0
+    EXA_RETRY_BUDGET: float = 25.0  # no new attempt after this many seconds
+    EXA_RETRY_READ_TIMEOUTS: bool = False  # Exa may still answer (and bill) a timed-out POST /answer
+    EXA_HEDGE_PERCENTILE: float = 95.0  # duplicate a call still running past this latency percentile; 0 = off
+    EXA_HEDGE_MIN_SAMPLES: int = 20
+    EXA_HEDGE_MIN_DELAY: float = 1.0
+    EXA_BREAKER_FAILURES: int = 5  # consecutive transient failures that open the circuit
+    EXA_BREAKER_RESET: float = 30.0  # seconds before a probe call is let through
+    RAPIDAPI_TIMEOUT: float = 60.0
+    RAPIDAPI_FILE_TIMEOUT: float = 120.0
+    RAPIDAPI_HTTP2: bool = False  # the downloader API rejects some HTTP/2 clients as bots
+    RAPIDAPI_MAX_CONNECTIONS: int = 20
+    RAPIDAPI_MAX_KEEPALIVE: int = 10
+    DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024  # bytes held in memory per download
+    STATUS_CACHE_TTL: float = 2.0  # seconds a RapidAPI /status answer is reused
+    STATUS_CACHE_MAX_ENTRIES: int = 1024  # least recently used jobs are dropped past this
+    DOWNLOAD_CONCURRENCY: int = 4  # parallel server-side downloads (ytdl.download_many)
+    DOWNLOAD_POLL_DEADLINE: float = 600.0  # give up on a RapidAPI job not ready after this many seconds
+    DOWNLOAD_BATCH_MAX_ITEMS: int = 50
+
+    # Content-addressed video store (see video_store.py)
+    VIDEO_STORAGE_DIR: str = os.path.join(os.path.dirname(__file__), "downloaded_videos")
+    PUBLIC_BASE_URL: str = "https://neda-pericardial-unanachronously.ngrok-free.dev"
+    VIDEO_STORE_INDEX_PATH: str = os.path.join(os.path.dirname(__file__), "data", "video_store.sqlite3")
+    VIDEO_STORE_MAX_BYTES: int = 20 * 1024 ** 3
+    # Partial downloads untouched this long are deleted at startup; younger ones may still be resumed
+    VIDEO_STORE_INCOMING_MAX_AGE: float = 24 * 3600
+
+    # Fact-check result cache (see fact_check_cache.py); empty path = memory only
+    FACTCHECK_CACHE_ENABLED: bool = True
+    FACTCHECK_CACHE_PATH: str = os.path.join(os.path.dirname(__file__), "data", "fact_check_cache.sqlite3")
+    FACTCHECK_CACHE_TTL: float = 7 * 24 * 3600
+    FACTCHECK_CACHE_MEMORY_SIZE: int = 2048
+    FACTCHECK_CACHE_DISK_SIZE: int = 100_000
+
+    # Near-duplicate claim reuse (see claim_index.py); shares the cache file. Off by default:
+    # character shingles also match claims that differ in one meaning-changing word
+    FACTCHECK_SIMILARITY_ENABLED: bool = False
+    FACTCHECK_SIMILARITY_THRESHOLD: float = 0.9
+    FACTCHECK_SIMILARITY_NUM_PERM: int = 64
+
+    # /fact-check/batch
+    FACTCHECK_BATCH_MAX_ITEMS: int = 200
+    FACTCHECK_BATCH_CONCURRENCY: int = 5
+
+    # Payload size: ?view=compact source text length (see projection.py) and gzip/brotli (see compression.py)
+    FACTCHECK_COMPACT_TEXT_CHARS: int = 280
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    # Stage timing (see tracing.py): Server-Timing header, optional JSON-lines trace log,
+    # optional pyinstrument profiles of requests slower than PROFILE_SLOW_MS (0 = off)
+    SERVER_TIMING_ENABLED: bool = True
+    TRACE_LOG_PATH: str = ""
+    TRACE_LOG_MIN_MS: float = 0.0
+    PROFILE_SLOW_MS: float = 0.0
+    PROFILE_SAMPLE_RATE: float = 1.0
+    PROFILE_DIR: str = os.path.join(os.path.dirname(__file__), "data", "profiles")
+
+    @property
+    def rapidapi_base_url(self) -> str:
+        return (self.RAPIDAPI_BASE_URL or f"https://{self.RAPIDAPI_HOST}").rstrip("/")
 
 settings = Settings()
@@ -0,0 +1,61 @@
+"""
+In-process request coalescing ("single-flight").
+
+Concurrent calls for the same key share one running task instead of each
+starting their own upstream work. The task is shielded, so a caller that
+disconnects doesn't abort the work for the callers still waiting on it.
+Keys are released as soon as the task finishes; results are not cached here.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.restarted = 0
+
+    async def do(self, key: Hashable, run: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return (result, shared). `shared` is True if this call joined a task another caller started.
+
+        Cancelling a caller (leader included) only detaches that caller. If the
+        shared task itself gets cancelled, callers that weren't cancelled start
+        a fresh one rather than failing with a CancelledError they didn't ask for.
+        """
+        while True:
+            task = self._inflight.get(key)
+            shared = task is not None
+            if task is None:
+                task = asyncio.ensure_future(run())
+                self._inflight[key] = task
+                task.add_done_callback(lambda t, k=key: self._release(k, t))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+            try:
+                return await asyncio.shield(task), shared
+            except asyncio.CancelledError:
+                if task.cancelled() and not _cancelling():
+                    self.restarted += 1
+                    continue
+                raise
+
+    def _release(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Nobody may be left awaiting a failed task; retrieve the exception so it isn't logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {"inFlight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced,
+                "restarted": self.restarted}
+
+
+def _cancelling() -> bool:
+    """True if the current task has a pending cancellation request (3.11+)."""
+    task = asyncio.current_task()
+    return bool(task is not None and getattr(task, "cancelling", lambda: 0)())
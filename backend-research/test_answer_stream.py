@@ -0,0 +1,32 @@
+from answer_stream import StructuredAnswerParser
+
+ANSWER = (
+    "TITLE: Moon landing\n"
+    "DESCRIPTION: Claims the first crewed landing was in 1969.\n"
+    "SCORE: 5\n"
+    "ANALYSIS: Apollo 11 landed on 20 July 1969."
+)
+
+
+def _feed(chunks):
+    parser = StructuredAnswerParser()
+    events = [event for chunk in chunks for event in parser.feed(chunk)] + parser.finish()
+    return parser, events
+
+
+def test_fields_are_reported_once_whatever_the_chunking():
+    _, whole = _feed([ANSWER])
+    _, chars = _feed(list(ANSWER))
+    fields = [event for event in chars if event[0] != "analysis"]
+    assert fields == [
+        ("title", "Moon landing"),
+        ("description", "Claims the first crewed landing was in 1969."),
+        ("score", 5),
+    ]
+    assert fields == [event for event in whole if event[0] != "analysis"]
+    assert "".join(value for name, value in chars if name == "analysis") == "Apollo 11 landed on 20 July 1969."
+
+
+def test_parsed_text_is_not_retained():
+    parser, _ = _feed([ANSWER] + [" more analysis"] * 1000)
+    assert parser._tail == ""
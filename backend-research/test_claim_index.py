@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+import claim_index
+import fact_check_cache
+from models import FactCheckResponse
+
+
+@pytest.fixture
+def index():
+    # Low threshold so the number/negation guard, not the similarity cut-off, has to reject
+    idx = claim_index.ClaimIndex(None, threshold=0.5)
+    asyncio.run(idx.add("k1", "Global temperatures have risen by 1.1 degrees since 1900."))
+    asyncio.run(idx.add("k2", "Vaccines cause autism in young children."))
+    return idx
+
+
+def test_identical_claim_matches(index):
+    match = index.query("Global temperatures have risen by 1.1 degrees since 1900")
+    assert match is not None
+    assert match.key == "k1"
+    assert match.similarity == 1.0
+
+
+def test_changed_number_does_not_match(index):
+    assert index.query("Global temperatures have risen by 2.1 degrees since 1900.") is None
+    assert index.query("Global temperatures have risen by 1.1 degrees since 1950.") is None
+
+
+def test_negated_claim_does_not_match(index):
+    assert index.query("Vaccines do not cause autism in young children.") is None
+    assert index.query("Vaccines don't cause autism in young children.") is None
+    assert index.query("Vaccines never cause autism in young children.") is None
+
+
+def test_discarded_claim_is_not_returned(index):
+    asyncio.run(index.discard("k2"))
+    assert index.query("Vaccines cause autism in young children.") is None
+    assert index.stats()["claims"] == 1
+
+
+def test_signatures_survive_reload(tmp_path):
+    path = str(tmp_path / "claims.sqlite3")
+    first = claim_index.ClaimIndex(path, threshold=0.9)
+    asyncio.run(first.add("k1", "Vaccines do not cause autism."))
+    first.close()
+
+    second = claim_index.ClaimIndex(path, threshold=0.9)
+    assert second.load() == 1
+    assert second.query("Vaccines do not cause autism!").key == "k1"
+    assert second.query("Vaccines cause autism!") is None
+    second.close()
+
+
+def _verdict() -> FactCheckResponse:
+    return FactCheckResponse(title="t", description="d", truthfulnessScore=3, response="r", sources=[])
+
+
+def test_signatures_follow_the_cache_prune(tmp_path, monkeypatch):
+    monkeypatch.setattr(fact_check_cache, "_PRUNE_EVERY", 1)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = fact_check_cache.FactCheckCache(path, ttl_seconds=60, memory_size=0, disk_size=1)
+    index = claim_index.ClaimIndex(path, threshold=0.9)
+    for claim in ("Vaccines do not cause autism.", "The moon landing happened in 1969."):
+        key = asyncio.run(cache.set(claim, _verdict()))
+        asyncio.run(index.add(key, claim))
+
+    # disk_size=1: the second write evicted the first entry and its signature with it
+    (count,) = index._db.execute("SELECT COUNT(*) FROM claim_signatures").fetchone()
+    assert count == 1
+    index.close()
+    cache.close()
+
+
+def test_load_skips_and_drops_expired_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = fact_check_cache.FactCheckCache(path, ttl_seconds=60, memory_size=0, disk_size=10)
+    index = claim_index.ClaimIndex(path, threshold=0.9)
+    for claim in ("Vaccines do not cause autism.", "The moon landing happened in 1969."):
+        key = asyncio.run(cache.set(claim, _verdict()))
+        asyncio.run(index.add(key, claim))
+    cache._db.execute(
+        "UPDATE fact_checks SET expires_at = 0 WHERE key = ?",
+        (fact_check_cache.claim_key("Vaccines do not cause autism."),),
+    )
+    index.close()
+
+    reloaded = claim_index.ClaimIndex(path, threshold=0.9)
+    assert reloaded.load() == 1
+    assert reloaded.query("Vaccines do not cause autism!") is None
+    (count,) = reloaded._db.execute("SELECT COUNT(*) FROM claim_signatures").fetchone()
+    assert count == 1
+    reloaded.close()
+    cache.close()
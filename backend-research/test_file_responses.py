@@ -0,0 +1,99 @@
+import re
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import file_responses
+
+CONTENT = bytes(range(256)) * 4  # 1024 bytes, every offset distinguishable
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(CONTENT)
+
+    async def video(request):
+        return file_responses.RangeFileResponse(request, str(path), media_type="video/mp4")
+
+    with TestClient(Starlette(routes=[Route("/v", video, methods=["GET", "HEAD"])])) as tc:
+        yield tc
+
+
+def test_full_response_advertises_ranges(client):
+    response = client.get("/v")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(CONTENT))
+
+
+def test_single_range(client):
+    response = client.get("/v", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+    assert response.headers["content-length"] == "100"
+
+
+def test_suffix_and_open_ended_ranges(client):
+    assert client.get("/v", headers={"Range": "bytes=-10"}).content == CONTENT[-10:]
+    assert client.get("/v", headers={"Range": "bytes=1000-"}).content == CONTENT[1000:]
+
+
+def test_multipart_ranges(client):
+    response = client.get("/v", headers={"Range": "bytes=0-9, 500-509"})
+    assert response.status_code == 206
+    boundary = re.fullmatch(r"multipart/byteranges; boundary=(\w+)", response.headers["content-type"]).group(1)
+    assert int(response.headers["content-length"]) == len(response.content)
+
+    parts = response.content.split(f"--{boundary}".encode())
+    assert parts[0] == b"" and parts[-1] == b"--\r\n"
+    bodies = []
+    for part in parts[1:-1]:
+        head, _, body = part.partition(b"\r\n\r\n")
+        assert b"Content-Type: video/mp4" in head
+        bodies.append((re.search(rb"Content-Range: bytes (\d+)-(\d+)/1024", head).groups(), body[:-2]))
+    assert bodies == [((b"0", b"9"), CONTENT[0:10]), ((b"500", b"509"), CONTENT[500:510])]
+
+
+def test_overlapping_ranges_are_merged(client):
+    response = client.get("/v", headers={"Range": "bytes=0-9, 5-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[0:20]
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/v", headers={"Range": "bytes=5000-6000"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_conditional_requests_return_304(client):
+    first = client.get("/v")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    by_etag = client.get("/v", headers={"If-None-Match": etag})
+    assert by_etag.status_code == 304
+    assert by_etag.content == b""
+    assert by_etag.headers["etag"] == etag
+
+    assert client.get("/v", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/v", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_range_mismatch_sends_whole_file(client):
+    etag = client.head("/v").headers["etag"]
+    assert client.get("/v", headers={"Range": "bytes=0-9", "If-Range": etag}).status_code == 206
+    stale = client.get("/v", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == CONTENT
+
+
+def test_head_sends_headers_only(client):
+    response = client.head("/v", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "10"
+    assert response.content == b""
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import resilience
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://exa.test/answer")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+def test_breaker_opens_after_threshold_and_probes_after_reset():
+    breaker = resilience.CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # the single probe
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # others wait for the probe's outcome
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = resilience.CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.allow()
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.trips == 2
+
+
+def test_call_fails_fast_once_open():
+    r = resilience.Resilience("exa", retry_attempts=1, hedge_percentile=0, breaker_failures=2, breaker_reset=60)
+    sends = 0
+
+    async def send():
+        nonlocal sends
+        sends += 1
+        raise _status_error(503)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await r.call(send)
+        with pytest.raises(resilience.CircuitOpenError):
+            await r.call(send)
+
+    asyncio.run(run())
+    assert sends == 2
+
+
+def test_transient_errors_are_retried_but_client_errors_are_not():
+    r = resilience.Resilience("exa", retry_attempts=3, retry_base_delay=0.001, hedge_percentile=0)
+    statuses = iter([503, 502, 200])
+
+    async def flaky():
+        status = next(statuses)
+        if status != 200:
+            raise _status_error(status)
+        return "ok"
+
+    assert asyncio.run(r.call(flaky)) == "ok"
+    assert r.retries == 2
+
+    async def bad_request():
+        raise _status_error(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(r.call(bad_request))
+    assert r.retries == 2
+    assert r.breaker.state == "closed"
+
+
+def test_read_timeouts_are_not_retried_by_default():
+    r = resilience.Resilience("exa", retry_attempts=3, retry_base_delay=0.001, hedge_percentile=0)
+    sends = 0
+
+    async def slow():
+        nonlocal sends
+        sends += 1
+        raise httpx.ReadTimeout("timed out")
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(r.call(slow))
+    assert sends == 1
+    assert r.breaker.failures == 1
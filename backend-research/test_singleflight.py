@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+import singleflight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = singleflight.SingleFlight()
+    runs = 0
+
+    async def work():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert runs == 1
+    assert [r for r, _ in results] == ["result"] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert flight.stats()["inFlight"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = singleflight.SingleFlight()
+    runs = 0
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def work():
+            nonlocal runs
+            runs += 1
+            await gate.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        gate.set()
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == [("done", True)] * 3
+    assert runs == 1
+
+
+def test_cancelled_shared_task_restarts_for_remaining_callers():
+    flight = singleflight.SingleFlight()
+    runs = 0
+
+    async def main():
+        async def work():
+            nonlocal runs
+            runs += 1
+            if runs == 1:
+                asyncio.current_task().cancel()  # the shared task itself dies
+                await asyncio.sleep(1)
+            return runs
+
+        callers = [asyncio.ensure_future(flight.do("k", work)) for _ in range(2)]
+        return await asyncio.gather(*callers)
+
+    results = asyncio.run(main())
+    assert runs == 2
+    assert {r for r, _ in results} == {2}
+    assert flight.stats()["restarted"] >= 1
+
+
+def test_errors_reach_every_caller_and_release_the_key():
+    flight = singleflight.SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["inFlight"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+
+import httpx
+
+import ytdl
+
+DATA = bytes(range(256)) * 64
+URL = "https://rapid.test/file/job1/video.mp4"
+
+
+class FakeFileServer(httpx.AsyncBaseTransport):
+    """Serves DATA with Range support; can cut the first body short or answer a resume with a wrong range."""
+
+    def __init__(self, cut_first_at=None, wrong_start=False):
+        self.cut_first_at = cut_first_at
+        self.wrong_start = wrong_start
+        self.requests = []
+
+    async def handle_async_request(self, request):
+        self.requests.append((request.headers.get("range"), request.headers.get("if-range")))
+        headers = {"etag": '"v1"'}
+        range_header = request.headers.get("range")
+        if range_header:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if self.wrong_start:
+                self.wrong_start = False
+                start = 0
+            return httpx.Response(206, content=DATA[start:], headers={
+                **headers, "content-range": f"bytes {start}-{len(DATA) - 1}/{len(DATA)}"})
+        if self.cut_first_at is not None:
+            cut, self.cut_first_at = self.cut_first_at, None
+
+            class CutStream(httpx.AsyncByteStream):
+                async def __aiter__(self):
+                    yield DATA[:cut]
+                    raise httpx.ReadError("connection reset")
+
+            return httpx.Response(200, stream=CutStream(), headers={**headers, "content-length": str(len(DATA))})
+        return httpx.Response(200, content=DATA, headers=headers)
+
+
+def _fetch(server, out_path):
+    async def run():
+        async with httpx.AsyncClient(transport=server) as client:
+            return await ytdl.fetch_file(client, URL, {}, str(out_path), chunk_size=1024)
+    return asyncio.run(run())
+
+
+def _part_path(out_path):
+    return f"{out_path}.{hashlib.sha1(URL.encode()).hexdigest()[:16]}.part"
+
+
+def test_resume_sends_if_range_and_appends(tmp_path):
+    out = tmp_path / "video.mp4"
+    server = FakeFileServer(cut_first_at=4096)
+    result = _fetch(server, out)
+    assert out.read_bytes() == DATA
+    assert result["resumes"] == 1
+    assert server.requests == [(None, None), ("bytes=4096-", '"v1"')]
+
+
+def test_range_reply_not_starting_at_offset_restarts(tmp_path):
+    out = tmp_path / "video.mp4"
+    with open(_part_path(out), "wb") as f:
+        f.write(DATA[:3000])
+    server = FakeFileServer(wrong_start=True)
+    _fetch(server, out)
+    assert out.read_bytes() == DATA
+    assert server.requests == [("bytes=3000-", None), (None, None)]
+
+
+def test_partial_file_of_another_job_is_ignored(tmp_path):
+    out = tmp_path / "video.mp4"
+    other_job = f"{out}.{hashlib.sha1(b'https://rapid.test/file/job0/video.mp4').hexdigest()[:16]}.part"
+    with open(other_job, "wb") as f:
+        f.write(b"x" * 500)
+    server = FakeFileServer()
+    _fetch(server, out)
+    assert out.read_bytes() == DATA
+    assert server.requests == [(None, None)]
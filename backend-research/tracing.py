@@ -0,0 +1,221 @@
+"""
+Per-request stage timing: Server-Timing header, X-Trace-Id and an optional trace log.
+
+TracingMiddleware starts a Trace for every HTTP request and keeps it in a
+contextvar. If the request carries an X-Trace-Id, that id is reused, so both
+sides of the embedding -> research hop log the same id. Hot-path code marks
+stages with `span("name")`, or with `record("name", seconds)` for time it
+has already measured. Outside a request both are no-ops.
+
+At response start the spans are summed per name into a Server-Timing header.
+Streamed responses only include the stages that finished before the first
+byte. With a trace log path set, each request is also written as one JSON
+line, from a background thread.
+
+If PROFILE_SLOW_MS is set and pyinstrument is installed, each request runs
+under a sampling profiler. Only requests slower than the threshold keep
+their profile, as <trace id>.html in the profile dir.
+
+This file is kept identical in backend-research and backend-video-embedding:
+each service is built with its own directory as the Docker context, so neither
+image can import the other's copy. Change both; the embedding service's
+test_shared_modules.py fails when they differ.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyinstrument import Profiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+TRACE_HEADER = "x-trace-id"
+_TRACE_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+_SERVER_TIMING_ENTRY = re.compile(r"^\s*([^;,\s]+)(?:.*?;\s*dur=([0-9.]+))?", re.IGNORECASE)
+
+
+class Trace:
+    """Spans of one request. `prefix` views share the span list (in-process research)."""
+    __slots__ = ("trace_id", "started", "spans", "prefix")
+
+    def __init__(self, trace_id: str, started: Optional[float] = None,
+                 spans: Optional[List[Tuple[str, float, float]]] = None, prefix: str = ""):
+        self.trace_id = trace_id
+        self.started = time.perf_counter() if started is None else started
+        self.spans = [] if spans is None else spans
+        self.prefix = prefix
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        self.spans.append((self.prefix + name, start - self.started, duration))
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+def current_id() -> Optional[str]:
+    trace = _current.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter() - start)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add a stage that ended now and lasted `seconds` (timed by the caller)."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, time.perf_counter() - seconds, seconds)
+
+
+def add_remote(server_timing: Optional[str], prefix: str) -> None:
+    """Fold a downstream service's Server-Timing header into this trace as `<prefix><name>` spans."""
+    if not server_timing or _current.get() is None:
+        return
+    for entry in server_timing.split(","):
+        match = _SERVER_TIMING_ENTRY.match(entry)
+        if match and match.group(2):
+            record(prefix + match.group(1), float(match.group(2)) / 1000)
+
+
+@contextmanager
+def bind(trace: Optional[Trace], prefix: str = "") -> Iterator[None]:
+    """Make `trace` (possibly another module's) current, with span names prefixed."""
+    if trace is None:
+        yield
+        return
+    token = _current.set(Trace(trace.trace_id, trace.started, trace.spans, trace.prefix + prefix))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def server_timing(trace: Trace, total: float) -> str:
+    """`total;dur=..., <name>;dur=...;desc="xN"`: spans summed per name (concurrent ones overlap)."""
+    totals: Dict[str, List[float]] = {}
+    for name, _, duration in trace.spans:
+        entry = totals.setdefault(name, [0.0, 0])
+        entry[0] += duration
+        entry[1] += 1
+    parts = [f"total;dur={total * 1000:.1f}"]
+    for name, (duration, count) in totals.items():
+        parts.append(f"{name};dur={duration * 1000:.1f}" + (f';desc="x{count}"' if count > 1 else ""))
+    return ", ".join(parts)
+
+
+def _trace_logger(service: str, path: str) -> logging.Logger:
+    """JSON-lines logger whose file writes happen on a QueueListener thread, off the event loop."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    QueueListener(records, handler).start()
+    trace_logger = logging.getLogger(f"{__name__}.{service}")
+    trace_logger.setLevel(logging.INFO)
+    trace_logger.propagate = False
+    trace_logger.addHandler(QueueHandler(records))
+    return trace_logger
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp, service: str, server_timing: bool = True, log_path: str = "",
+                 log_min_ms: float = 0.0, profile_slow_ms: float = 0.0, profile_dir: str = "",
+                 profile_sample_rate: float = 1.0):
+        self.app = app
+        self.service = service
+        self.server_timing = server_timing
+        self.log = _trace_logger(service, log_path) if log_path else None
+        self.log_min_ms = log_min_ms
+        self.profile_slow_ms = profile_slow_ms
+        self.profile_dir = profile_dir
+        self.profile_sample_rate = profile_sample_rate
+        if profile_slow_ms > 0 and not PYINSTRUMENT_AVAILABLE:
+            logger.warning("PROFILE_SLOW_MS is set but pyinstrument is not installed; profiling is off")
+            self.profile_slow_ms = 0.0
+        if self.profile_slow_ms > 0:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or ()).get(TRACE_HEADER.encode(), b"").decode("latin-1")
+        trace = Trace(incoming if _TRACE_ID.match(incoming) else uuid.uuid4().hex[:16])
+        token = _current.set(trace)
+        status = 500
+        profiler = None
+        if self.profile_slow_ms > 0 and random.random() < self.profile_sample_rate:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((TRACE_HEADER.encode(), trace.trace_id.encode()))
+                if self.server_timing:
+                    timing = server_timing(trace, time.perf_counter() - trace.started)
+                    headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            elapsed_ms = (time.perf_counter() - trace.started) * 1000
+            if profiler is not None:
+                profiler.stop()
+                if elapsed_ms >= self.profile_slow_ms:
+                    self._save_profile(profiler, trace.trace_id)
+            if self.log is not None and elapsed_ms >= self.log_min_ms:
+                self.log.info(json.dumps({
+                    "ts": time.time(),
+                    "service": self.service,
+                    "traceId": trace.trace_id,
+                    "method": scope.get("method"),
+                    "path": scope.get("path"),
+                    "status": status,
+                    "durationMs": round(elapsed_ms, 2),
+                    "spans": [{"name": name, "startMs": round(start * 1000, 2), "durMs": round(duration * 1000, 2)}
+                              for name, start, duration in trace.spans],
+                }))
+
+    def _save_profile(self, profiler: "Profiler", trace_id: str) -> None:
+        path = os.path.join(self.profile_dir, f"{trace_id}.html")
+        try:
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        except OSError as e:
+            logger.warning("could not write profile %s: %s", path, e)
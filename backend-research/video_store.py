@@ -0,0 +1,225 @@
+"""
+Content-addressed storage for downloaded videos.
+
+Files are named after the SHA-256 of their bytes (computed while streaming),
+so the same video downloaded twice is stored once. A SQLite index maps
+source keys (the original video URL, or the RapidAPI job/file pair) to the
+content hash, which lets repeat requests skip the download entirely, and
+counts how many sources reference each blob. When the directory grows past
+max_bytes the least recently served blobs are garbage-collected,
+unreferenced ones first.
+
+Partial files are written under <root>/.incoming/, which /videos never
+serves, and moved into place once complete. Leftovers from interrupted
+downloads are removed at startup once they are older than a cut-off.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+# Subdirectory of the store root for in-progress downloads (same filesystem, so moves are atomic)
+INCOMING_DIR = ".incoming"
+
+
+class StoredVideo(NamedTuple):
+    sha256: str
+    filename: str
+    size: int
+    deduplicated: bool
+
+
+class VideoStore:
+    def __init__(self, root: str, index_path: str, max_bytes: int):
+        self.root = root
+        self.incoming = os.path.join(root, INCOMING_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.incoming, exist_ok=True)
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(index_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                refs INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_accessed ON blobs (accessed_at);
+            CREATE UNIQUE INDEX IF NOT EXISTS blobs_filename ON blobs (filename);
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+
+    async def lookup_source(self, source: str) -> Optional[StoredVideo]:
+        """Return the stored file for a source key if it is still on disk."""
+        return await asyncio.to_thread(self._lookup_source, source)
+
+    async def ingest_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        ext: str,
+        source: Optional[str] = None,
+    ) -> StoredVideo:
+        """
+        Write chunks to a temp file while hashing them (both in a worker thread),
+        then move the file to <sha256><ext> unless that blob already exists.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.incoming, suffix=".part")
+        digest = hashlib.sha256()
+        size = 0
+
+        def write(f, chunk: bytes) -> None:
+            f.write(chunk)
+            digest.update(chunk)
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    await asyncio.to_thread(write, f, chunk)
+                    size += len(chunk)
+            return await asyncio.to_thread(self._commit, tmp_path, digest.hexdigest(), size, ext, source)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+
+    async def ingest_file(self, path: str, ext: str, source: Optional[str] = None) -> StoredVideo:
+        """Hash an already-downloaded file (in a worker thread) and move it into the store."""
+        def hash_and_commit() -> StoredVideo:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            return self._commit(path, digest.hexdigest(), os.path.getsize(path), ext, source)
+
+        return await asyncio.to_thread(hash_and_commit)
+
+    async def touch(self, filename: str) -> None:
+        """Record that a blob was served, for LRU garbage collection."""
+        await asyncio.to_thread(self._execute, "UPDATE blobs SET accessed_at = ? WHERE filename = ?", (time.time(), filename))
+
+    def remove_stale_incoming(self, max_age: float) -> List[str]:
+        """Delete partial downloads not written to for `max_age` seconds (blocking; call at startup)."""
+        removed: List[str] = []
+        cutoff = time.time() - max_age
+        with os.scandir(self.incoming) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed.append(entry.name)
+                except OSError:
+                    pass
+        return removed
+
+    async def gc(self) -> List[str]:
+        """Delete blobs until the store is under max_bytes. Returns removed filenames."""
+        return await asyncio.to_thread(self._gc)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            blobs, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            (sources,) = self._db.execute("SELECT COUNT(*) FROM sources").fetchone()
+        return {"blobs": blobs, "bytes": total, "maxBytes": self.max_bytes, "sources": sources}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._db.execute(sql, params)
+
+    def _lookup_source(self, source: str) -> Optional[StoredVideo]:
+        with self._lock:
+            row = self._db.execute(
+                """
+                SELECT b.sha256, b.filename, b.size FROM sources s
+                JOIN blobs b ON b.sha256 = s.sha256 WHERE s.source = ?
+                """,
+                (source,),
+            ).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(os.path.join(self.root, row[1])):
+                # blob vanished from disk (volume wiped); forget it
+                self._forget(row[0])
+                return None
+            self._db.execute("UPDATE blobs SET accessed_at = ? WHERE sha256 = ?", (time.time(), row[0]))
+        return StoredVideo(sha256=row[0], filename=row[1], size=row[2], deduplicated=True)
+
+    def _commit(self, tmp_path: str, sha256: str, size: int, ext: str, source: Optional[str]) -> StoredVideo:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT filename FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            filename = row[0] if row else f"{sha256}{ext}"
+            dest = os.path.join(self.root, filename)
+            deduplicated = row is not None and os.path.exists(dest)
+            if deduplicated:
+                _remove_quietly(tmp_path)
+                self._db.execute("UPDATE blobs SET accessed_at = ? WHERE sha256 = ?", (now, sha256))
+            else:
+                os.replace(tmp_path, dest)
+                self._db.execute(
+                    """
+                    INSERT INTO blobs (sha256, filename, size, refs, created_at, accessed_at)
+                    VALUES (?, ?, ?, 0, ?, ?)
+                    ON CONFLICT(sha256) DO UPDATE SET size = excluded.size, accessed_at = excluded.accessed_at
+                    """,
+                    (sha256, filename, size, now, now),
+                )
+            if source is not None:
+                previous = self._db.execute("SELECT sha256 FROM sources WHERE source = ?", (source,)).fetchone()
+                if previous is None or previous[0] != sha256:
+                    if previous is not None:
+                        self._db.execute("UPDATE blobs SET refs = MAX(refs - 1, 0) WHERE sha256 = ?", (previous[0],))
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO sources (source, sha256, created_at) VALUES (?, ?, ?)",
+                        (source, sha256, now),
+                    )
+                    self._db.execute("UPDATE blobs SET refs = refs + 1 WHERE sha256 = ?", (sha256,))
+        if not deduplicated and self.max_bytes:
+            self._gc()
+        return StoredVideo(sha256=sha256, filename=filename, size=size, deduplicated=deduplicated)
+
+    def _gc(self) -> List[str]:
+        removed: List[str] = []
+        with self._lock:
+            (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            if total <= self.max_bytes:
+                return removed
+            # unreferenced blobs go first, then least recently served
+            rows = self._db.execute(
+                "SELECT sha256, filename, size FROM blobs ORDER BY refs > 0, accessed_at ASC"
+            ).fetchall()
+            for sha256, filename, size in rows:
+                if total <= self.max_bytes:
+                    break
+                _remove_quietly(os.path.join(self.root, filename))
+                self._forget(sha256)
+                removed.append(filename)
+                total -= size
+        return removed
+
+    def _forget(self, sha256: str) -> None:
+        self._db.execute("DELETE FROM sources WHERE sha256 = ?", (sha256,))
+        self._db.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
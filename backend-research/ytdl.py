@@ -1,37 +1,286 @@
-import os, time, requests
+"""
+Download a YouTube video through the RapidAPI downloader straight to disk.
+
+The flow is start job -> poll /status -> GET /file. Polling backs off
+exponentially under an overall deadline, riding out transient 5xx and
+connection errors until then, and the file is written to a `.part` file
+named after the file URL, so an interrupted transfer resumes with a Range
+request instead of starting over. Resumes carry If-Range with the first
+response's validator and only append a 206 whose Content-Range starts
+exactly where the partial file ends; anything else restarts from zero. `download_many` runs several downloads over one
+connection pool under a concurrency limit.
+
+`download_to_disk` is the blocking wrapper for scripts; async callers (the API)
+use `download_to_disk_async` and can pass their own pooled client.
+"""
+import asyncio, hashlib, json, os, random, re, time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
 
 BASE = "https://api.youtubedownloadapi.com/v1"
+RAPIDAPI_HOST = "yt-video-audio-downloader-api.p.rapidapi.com"
 
-def download_to_disk(youtube_url: str, out_path: str, quality: int = 720, rapidapi_key: str | None = None):
+POLL_INITIAL = 1.0        # first wait between /status calls (seconds)
+POLL_MAX = 15.0           # cap for the backoff
+POLL_DEADLINE = 600.0     # give up on a job that isn't ready after this long
+MAX_RESUMES = 5           # reconnects allowed per file transfer
+CHUNK_SIZE = 1024 * 256
+DEFAULT_CONCURRENCY = 4
+
+READY_STATUSES = {"ready", "completed"}
+FAILED_STATUSES = {"error", "failed"}
+# /status answers worth polling through until the deadline
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+_CONTENT_RANGE_RE = re.compile(r"^\s*bytes\s+(\d+)-(\d+)/(\d+|\*)\s*$", re.IGNORECASE)
+
+
+class DownloadError(RuntimeError):
+    """The upstream job failed, timed out, or the file transfer could not be completed."""
+
+
+class JobTimeout(DownloadError):
+    """The job was still not ready when the polling deadline passed."""
+
+
+@dataclass
+class DownloadItem:
+    url: str
+    out_path: str
+    quality: int = 720
+    format: str = "mp4"
+
+
+def _headers(rapidapi_key: Optional[str]) -> Dict[str, str]:
     key = rapidapi_key or os.getenv("RAPIDAPI_KEY")
     if not key:
         raise RuntimeError("RAPIDAPI_KEY not set")
-
-    H = {
+    return {
         "Content-Type": "application/json",
         "x-rapidapi-key": key,
-        "X-RapidAPI-Host": "yt-video-audio-downloader-api.p.rapidapi.com",
+        "X-RapidAPI-Host": RAPIDAPI_HOST,
     }
-    # start
-    r = requests.post(f"{BASE}/download", headers=H,
-                      json={"url": youtube_url, "format": "mp4", "quality": quality})
-    r.raise_for_status()
-    jobId = r.json()["jobId"]
-    # poll
+
+
+def parse_response(r: httpx.Response) -> Dict[str, Any]:
+    """
+    Decode a RapidAPI body into a dict.
+
+    The API sometimes returns its JSON object double-encoded as a JSON string;
+    anything that still isn't an object comes back as {"raw": <body text>}.
+    """
+    try:
+        data = r.json()
+        if isinstance(data, str) and data.strip().startswith("{"):
+            data = json.loads(data)
+    except ValueError:
+        data = None
+    return data if isinstance(data, dict) else {"raw": r.text}
+
+
+def upstream_error(r: httpx.Response, data: Dict[str, Any]) -> Optional[str]:
+    """Error message for a failed call (HTTP error or the bot-blocking 200), None if it succeeded."""
+    error = data.get("error")
+    blocked = isinstance(error, str) and "Automated requests" in error
+    if r.status_code < 400 and not blocked:
+        return None
+    return str(error or data.get("message") or r.text[:300])
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(timeout=httpx.Timeout(60.0, read=120.0))
+
+
+async def start_job(client: httpx.AsyncClient, base_url: str, headers: Dict[str, str],
+                    youtube_url: str, fmt: str = "mp4", quality: int = 720) -> str:
+    r = await client.post(f"{base_url}/download", headers=headers,
+                          json={"url": youtube_url, "format": fmt, "quality": quality})
+    data = parse_response(r)
+    error = upstream_error(r, data)
+    if error is not None:
+        raise DownloadError(f"download request failed ({r.status_code}): {error}")
+    if not data.get("jobId"):
+        raise DownloadError(f"invalid response from upstream: {str(data)[:300]}")
+    return str(data["jobId"])
+
+
+async def wait_for_job(client: httpx.AsyncClient, base_url: str, headers: Dict[str, str], job_id: str,
+                       deadline: float = POLL_DEADLINE, initial: float = POLL_INITIAL,
+                       max_delay: float = POLL_MAX) -> str:
+    """
+    Poll /status with jittered exponential backoff; return the filename once ready.
+
+    Connection errors and transient HTTP statuses are retried like a pending
+    job until the deadline; other HTTP errors fail the download immediately.
+    """
+    give_up_at = time.monotonic() + deadline
+    delay = initial
+    status = "unknown"
+    while True:
+        try:
+            r = await client.get(f"{base_url}/status/{job_id}", headers=headers)
+        except httpx.TransportError as e:
+            status = f"{type(e).__name__}: {e}"
+        else:
+            s = parse_response(r)
+            error = upstream_error(r, s)
+            if error is not None:
+                if r.status_code not in TRANSIENT_STATUSES:
+                    raise DownloadError(f"status check failed ({r.status_code}): {error}")
+                status = f"HTTP {r.status_code}"
+            else:
+                status = str(s.get("status", "")).lower() or "unknown"
+                if status in FAILED_STATUSES:
+                    raise DownloadError(s.get("message") or s.get("error") or "download failed")
+                if status in READY_STATUSES and s.get("filename"):
+                    return s["filename"]
+
+        remaining = give_up_at - time.monotonic()
+        if remaining <= 0:
+            raise JobTimeout(f"job {job_id} not ready after {deadline:g}s (last status: {status})")
+        await asyncio.sleep(min(delay * random.uniform(0.8, 1.2), remaining))
+        delay = min(delay * 2, max_delay)
+
+
+async def fetch_file(client: httpx.AsyncClient, url: str, headers: Dict[str, str], out_path: str,
+                     max_resumes: int = MAX_RESUMES, chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Stream `url` into `out_path`, resuming from a `.part` file after a dropped connection.
+
+    The partial file is keyed on `url` (i.e. on the RapidAPI job), so a new job
+    for the same video never appends to another job's bytes. A partial file left
+    by an earlier run of the same job is resumed too. If the server ignores the
+    Range header or the If-Range validator no longer matches (200 instead of 206),
+    or a 206 doesn't start at the current offset, the partial file is discarded.
+    """
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    part_path = f"{out_path}.{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.part"
+    resumes = 0
+    total: Optional[int] = None
+    validator: Optional[str] = None  # strong ETag or Last-Modified of the response being resumed
+
     while True:
-        s = requests.get(f"{BASE}/status/{jobId}", headers=H).json()
-        if s["status"] == "error":
-            raise RuntimeError(s.get("message", "download failed"))
-        if s["status"] == "ready":
-            filename = s["filename"]
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        req_headers = dict(headers)
+        if offset:
+            req_headers["Range"] = f"bytes={offset}-"
+            if validator:
+                req_headers["If-Range"] = validator
+        try:
+            async with client.stream("GET", url, headers=req_headers) as resp:
+                if resp.status_code == 416 and offset:
+                    # Nothing left to send: the partial file is already complete
+                    break
+                if resp.status_code not in (200, 206):
+                    body = await resp.aread()
+                    raise DownloadError(f"file download failed ({resp.status_code}): "
+                                        f"{body[:300].decode('utf-8', errors='replace')}")
+                if resp.status_code == 206:
+                    match = _CONTENT_RANGE_RE.match(resp.headers.get("content-range", ""))
+                    if match is None or int(match.group(1)) != offset:
+                        # Not the continuation of our partial file: start over from byte 0
+                        await asyncio.to_thread(_remove_quietly, part_path)
+                        validator = None
+                        resumes += 1
+                        if resumes > max_resumes:
+                            raise DownloadError(f"transfer of {url} failed: unusable range responses")
+                        continue
+                    if match.group(3) != "*":
+                        total = int(match.group(3))
+                    mode = "ab"
+                else:
+                    offset = 0
+                    length = resp.headers.get("content-length")
+                    total = int(length) if length and length.isdigit() else None
+                    mode = "wb"
+                    etag = resp.headers.get("etag", "")
+                    validator = etag if etag and not etag.startswith("W/") else resp.headers.get("last-modified")
+                # File I/O goes to a worker thread so a slow disk doesn't stall the event loop
+                f = await asyncio.to_thread(open, part_path, mode)
+                try:
+                    async for chunk in resp.aiter_bytes(chunk_size):
+                        await asyncio.to_thread(f.write, chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+        except (httpx.TransportError, httpx.StreamError):
+            resumes += 1
+            if resumes > max_resumes:
+                raise DownloadError(f"transfer of {url} failed after {max_resumes} resumes")
+            await asyncio.sleep(min(2 ** resumes * 0.25, 5.0))
+            continue
+
+        size = os.path.getsize(part_path)
+        if total is None or size >= total:
             break
-        time.sleep(2)
-    # fetch
-    with requests.get(f"{BASE}/file/{jobId}/{filename}", headers=H, stream=True) as resp:
-        resp.raise_for_status()
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        with open(out_path, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=1024 * 256):
-                if chunk:
-                    f.write(chunk)
-    return {"path": out_path}
+        # Stream ended cleanly but short: the connection was cut, resume from what we have
+        resumes += 1
+        if resumes > max_resumes:
+            raise DownloadError(f"transfer of {url} incomplete ({size}/{total} bytes)")
+
+    os.replace(part_path, out_path)
+    return {"path": out_path, "bytes": os.path.getsize(out_path), "resumes": resumes}
+
+
+async def download_to_disk_async(youtube_url: str, out_path: str, quality: int = 720,
+                                 rapidapi_key: Optional[str] = None, *, fmt: str = "mp4",
+                                 client: Optional[httpx.AsyncClient] = None, base_url: str = BASE,
+                                 headers: Optional[Dict[str, str]] = None,
+                                 deadline: float = POLL_DEADLINE) -> dict:
+    """Run the whole start/poll/fetch flow. Pass `client` to reuse an existing connection pool."""
+    headers = headers or _headers(rapidapi_key)
+    own_client = client is None
+    client = client or _new_client()
+    try:
+        job_id = await start_job(client, base_url, headers, youtube_url, fmt, quality)
+        filename = await wait_for_job(client, base_url, headers, job_id, deadline=deadline)
+        result = await fetch_file(client, f"{base_url}/file/{job_id}/{filename}", headers, out_path)
+        result.update(jobId=job_id, filename=filename)
+        return result
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+async def download_many(items: Sequence[DownloadItem], concurrency: int = DEFAULT_CONCURRENCY,
+                        rapidapi_key: Optional[str] = None, *, client: Optional[httpx.AsyncClient] = None,
+                        base_url: str = BASE, headers: Optional[Dict[str, str]] = None,
+                        deadline: float = POLL_DEADLINE) -> List[dict]:
+    """
+    Download `items` in parallel, at most `concurrency` at a time.
+
+    Results come back in input order; a failed item (whatever the exception)
+    yields {"error": ...} instead of aborting the batch.
+    """
+    headers = headers or _headers(rapidapi_key)
+    own_client = client is None
+    client = client or _new_client()
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(item: DownloadItem) -> dict:
+        async with sem:
+            try:
+                return await download_to_disk_async(item.url, item.out_path, item.quality, fmt=item.format,
+                                                    client=client, base_url=base_url, headers=headers,
+                                                    deadline=deadline)
+            except Exception as e:
+                return {"path": item.out_path, "error": str(e) or type(e).__name__}
+
+    try:
+        return await asyncio.gather(*(one(item) for item in items))
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def download_to_disk(youtube_url: str, out_path: str, quality: int = 720, rapidapi_key: str | None = None):
+    """Blocking wrapper around `download_to_disk_async` for scripts and notebooks."""
+    return asyncio.run(download_to_disk_async(youtube_url, out_path, quality, rapidapi_key))
@@ -0,0 +1,41 @@
+"""
+Fast JSON encoding for the hot response paths.
+
+`dumps`/`loads` use orjson when it is installed (stdlib json otherwise).
+`splice` writes already-encoded JSON values (fact-check bodies from
+backend-research) into an output object without decoding them first.
+"""
+import json
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps(obj: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def splice(obj: Dict[str, Any], raw: Optional[Dict[str, bytes]] = None) -> bytes:
+    """`dumps(obj)` with each `raw` value (already JSON) added under its key, as-is."""
+    head = dumps(obj)
+    if not raw:
+        return head
+    parts = [head[:-1]]
+    sep = b"," if len(obj) else b""
+    for key, value in raw.items():
+        parts.append(sep + dumps(key) + b":" + value)
+        sep = b","
+    parts.append(b"}")
+    return b"".join(parts)
@@ -1,11 +1,17 @@
 import os
+import asyncio
+import random
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
 from dataclasses import dataclass
-from typing import List, Dict, Optional
-from twelvelabs import TwelveLabs
+from typing import Awaitable, Callable, List, Dict, Optional
+from twelvelabs import TwelveLabs, AsyncTwelveLabs
 from twelvelabs.indexes import IndexesCreateRequestModelsItem
 from twelvelabs.tasks import TasksRetrieveResponse
+from video_registry import VideoRegistry, VideoRecord
+from summary_cache import SummaryCache, summary_key
+import metrics
+import tracing
 
 # Load env from project root and optionally from a module-local .env
 load_dotenv(find_dotenv(usecwd=True))
@@ -13,6 +19,32 @@ module_env_path = Path(__file__).resolve().parent / ".env"
 if module_env_path.exists():
     load_dotenv(module_env_path, override=False)
 
+# Non-blocking indexing poll: start at TL_POLL_INITIAL_SEC, back off to TL_POLL_MAX_SEC
+TL_POLL_INITIAL_SEC = float(os.getenv("TL_POLL_INITIAL_SEC", "2"))
+TL_POLL_MAX_SEC = float(os.getenv("TL_POLL_MAX_SEC", "20"))
+TL_INDEX_TIMEOUT = float(os.getenv("TL_INDEX_TIMEOUT", "1800"))
+TASK_DONE_STATUSES = {"ready", "failed"}
+
+# Pre-indexed video used when TLParams.test_flag is set
+TEST_VIDEO_ID = '68d916bcab29c1e01ef84ede'
+
+# One async client (and httpx pool) per process, shared by every HighlightService
+_async_client: Optional[AsyncTwelveLabs] = None
+
+
+def _get_api_key() -> str:
+    api_key = os.getenv("TL_API_KEY") or os.getenv("TWELVELABS_API_KEY")
+    if not api_key:
+        raise RuntimeError("TL_API_KEY not set in environment.")
+    return api_key
+
+
+def get_async_client() -> AsyncTwelveLabs:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncTwelveLabs(api_key=_get_api_key())
+    return _async_client
+
 
 @dataclass
 class TLParams:
@@ -24,12 +56,30 @@ class TLParams:
 
 
 class HighlightService:
-    def __init__(self, params: TLParams):
-        api_key = os.getenv("TL_API_KEY") or os.getenv("TWELVELABS_API_KEY")
-        if not api_key:
-            raise RuntimeError("TL_API_KEY not set in environment.")
-        self.client = TwelveLabs(api_key=api_key)
+    def __init__(
+        self,
+        params: TLParams,
+        registry: Optional[VideoRegistry] = None,
+        summary_cache: Optional[SummaryCache] = None,
+        on_status: Optional[Callable[[str], Awaitable[None]]] = None,
+    ):
+        self.api_key = _get_api_key()
+        self._client: Optional[TwelveLabs] = None
         self.params = params
+        self.registry = registry
+        self.summary_cache = summary_cache
+        self.on_status = on_status  # awaited with each polled indexing task status
+
+    @property
+    def client(self) -> TwelveLabs:
+        """Blocking SDK client, only built for the synchronous run()."""
+        if self._client is None:
+            self._client = TwelveLabs(api_key=self.api_key)
+        return self._client
+
+    @property
+    def aclient(self) -> AsyncTwelveLabs:
+        return get_async_client()
 
     def _status_callback(self, task: TasksRetrieveResponse):
         print(f"  Status={task.status}")
@@ -63,7 +113,7 @@ class HighlightService:
             print(f"Upload complete. The unique identifier of your video is {task.video_id}.")
             video_id = task.video_id
         else:
-            video_id = '68d916bcab29c1e01ef84ede'
+            video_id = TEST_VIDEO_ID
 
         # 3) Summarize highlights
         res = self.client.summarize(
@@ -72,7 +122,136 @@ class HighlightService:
             prompt=prompt,
             temperature=temperature,
         )
+        return self._to_highlights(res)
+
+    async def run_async(self, prompt: str, temperature: float) -> List[Dict]:
+        """
+        Non-blocking version of run(): same steps through the async SDK client,
+        with backoff polling instead of wait_for_done, so one video being indexed
+        doesn't stall the event loop for other requests.
+        """
+        video_id = await self.index_video()
+        return await self.summarize_highlights(video_id, prompt=prompt, temperature=temperature)
+
+    async def index_video(self) -> str:
+        """
+        Return the video id for params.video_url, indexing it first if needed.
+        With a registry, an already-indexed video is returned without any
+        TwelveLabs call and concurrent requests share one indexing run.
+        """
+        with tracing.span("tl.index"):
+            return await self._lookup_or_index()
+
+    async def _lookup_or_index(self) -> str:
+        if self.params.test_flag:
+            return TEST_VIDEO_ID
+        if self.registry is None:
+            return await self._index_video(None)
+
+        key = self.params.index_name
+        record = await self.registry.lookup(key)
+        if record is not None and record.status == "ready" and record.video_id:
+            return record.video_id
+        return await self.registry.single_flight(key, lambda: self._index_video(key))
+
+    async def _index_video(self, key: Optional[str]) -> str:
+        """Create the index and upload task, wait until ready and return the video id."""
+        record = None
+        if key is not None:
+            record = await self.registry.lookup(key) or VideoRecord(key=key, video_url=self.params.video_url)
+            if record.status == "ready" and record.video_id:
+                return record.video_id
+
+        # 1) Create index with Pegasus (reused if an earlier attempt already made it)
+        index_id = record.index_id if record else None
+        if not index_id:
+            with metrics.track("twelvelabs", "indexes.create"):
+                index = await self.aclient.indexes.create(
+                    index_name=self.params.index_name,
+                    models=[
+                        IndexesCreateRequestModelsItem(
+                            model_name=self.params.model_name,
+                            model_options=self.params.model_options or ["visual", "audio"],
+                        )
+                    ],
+                )
+            index_id = index.id
+            print(f"Created index: id={index_id}")
+            if record:
+                record.index_id, record.status = index_id, "index_created"
+                await self.registry.save(record)
+
+        # 2) Create the upload task, or resume polling one still in progress
+        task_id = record.task_id if record and record.status == "indexing" else None
+        if task_id:
+            print(f"Resuming task: id={task_id}")
+        else:
+            with metrics.track("twelvelabs", "tasks.create"):
+                task = await self.aclient.tasks.create(index_id=index_id, video_url=self.params.video_url)
+            task_id = task.id
+            print(f"Created task: id={task_id}")
+            if record:
+                record.task_id, record.status, record.error = task_id, "indexing", None
+                await self.registry.save(record)
+
+        try:
+            # Whole server-side indexing run, polls included
+            with metrics.track("twelvelabs", "indexing") as span:
+                task = await self.wait_for_task(task_id)
+                if task.status != "ready":
+                    span.outcome = "failed"
+                    raise RuntimeError(f"Indexing failed with status {task.status}")
+        except Exception as e:
+            if record:
+                record.status, record.error = "failed", str(e)
+                await self.registry.save(record)
+            raise
+
+        print(f"Upload complete. The unique identifier of your video is {task.video_id}.")
+        if record:
+            record.video_id, record.status = task.video_id, "ready"
+            await self.registry.save(record)
+        return task.video_id
+
+    async def wait_for_task(self, task_id: str) -> TasksRetrieveResponse:
+        """Poll an indexing task with jittered exponential backoff until it is done."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + TL_INDEX_TIMEOUT
+        delay = TL_POLL_INITIAL_SEC
+        while True:
+            with metrics.track("twelvelabs", "tasks.retrieve"):
+                task = await self.aclient.tasks.retrieve(task_id)
+            self._status_callback(task)
+            if self.on_status is not None:
+                await self.on_status(task.status)
+            if task.status in TASK_DONE_STATUSES:
+                return task
+            if loop.time() + delay > deadline:
+                raise TimeoutError(f"Indexing task {task_id} not done after {TL_INDEX_TIMEOUT:.0f}s")
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 1.5, TL_POLL_MAX_SEC)
+
+    async def summarize_highlights(self, video_id: str, prompt: str, temperature: float) -> List[Dict]:
+        key = summary_key(video_id, prompt, temperature, self.params.model_name)
+        if self.summary_cache is not None:
+            cached = await self.summary_cache.get(key)
+            if cached is not None:
+                return cached
+
+        with metrics.track("twelvelabs", "summarize"), tracing.span("tl.summarize"):
+            res = await self.aclient.summarize(
+                video_id=video_id,
+                type="highlight",
+                prompt=prompt,
+                temperature=temperature,
+            )
+        highlights = self._to_highlights(res)
+        if self.summary_cache is not None:
+            await self.summary_cache.set(key, video_id, highlights)
+        return highlights
 
+    @staticmethod
+    def _to_highlights(res) -> List[Dict]:
         highlights: List[Dict] = []
         if hasattr(res, "highlights") and res.highlights:
             for h in res.highlights:
@@ -0,0 +1,176 @@
+"""
+Background jobs for video indexing.
+
+POST /embed stores a job and returns its id immediately; a fixed pool of
+asyncio workers runs jobs from a queue and checkpoints status/progress to
+SQLite. Jobs that were queued or running when the process stopped are put
+back on the queue at startup, so submissions survive a restart.
+
+The store and queue belong to one start()/stop() cycle, so the manager can be
+started again (another lifespan, a reload, a test client) after a stop.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+from pydantic import BaseModel
+
+# status values
+QUEUED, RUNNING, READY, FAILED = "queued", "running", "ready", "failed"
+
+
+@dataclass
+class Job:
+    task_id: str
+    download_url: str
+    status: str = QUEUED
+    stage: Optional[str] = None
+    progress_pct: float = 0.0
+    error: Optional[str] = None
+    result: Optional[str] = None  # JSON of the runner's response model
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+
+_COLUMNS = (
+    "task_id", "download_url", "status", "stage", "progress_pct",
+    "error", "result", "created_at", "updated_at",
+)
+
+ProgressFn = Callable[[str, float], Awaitable[None]]
+RunnerFn = Callable[[Job, ProgressFn], Awaitable[BaseModel]]
+
+
+class JobManager:
+    def __init__(self, path: str, runner: RunnerFn, workers: int = 4):
+        self.path = path
+        self.runner = runner
+        self.workers = max(1, workers)
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._tasks: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                task_id TEXT PRIMARY KEY,
+                download_url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress_pct REAL NOT NULL,
+                error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        with self._lock:
+            self._db = db
+
+    async def start(self) -> int:
+        """Open the store, re-queue unfinished jobs and start the worker pool. Returns the number resumed."""
+        await asyncio.to_thread(self._open)
+        self._queue = asyncio.Queue()
+        pending = await asyncio.to_thread(self._unfinished)
+        for job in pending:
+            job.status, job.stage = QUEUED, "resumed"
+            await self._save(job)
+            self._queue.put_nowait(job.task_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return len(pending)
+
+    async def stop(self) -> None:
+        # Running jobs stay "running" in the store and are resumed on next start()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    async def submit(self, download_url: str) -> Job:
+        job = Job(task_id=uuid.uuid4().hex, download_url=download_url)
+        await self._save(job)
+        self._queue.put_nowait(job.task_id)
+        return job
+
+    async def get(self, task_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._get, task_id)
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall() if self._db else []
+        return {"jobs": dict(rows), "queued": self.queued, "workers": self.workers}
+
+    async def _worker(self) -> None:
+        while True:
+            task_id = await self._queue.get()
+            try:
+                job = await self.get(task_id)
+                if job is not None and job.status in (QUEUED, RUNNING):
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        async def progress(stage: str, pct: float) -> None:
+            job.stage, job.progress_pct = stage, max(job.progress_pct, pct)
+            await self._save(job)
+
+        job.status, job.error = RUNNING, None
+        await self._save(job)
+        try:
+            result = await self.runner(job, progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.status, job.error = FAILED, str(e) or e.__class__.__name__
+            await self._save(job)
+            return
+        job.status, job.stage, job.progress_pct = READY, "done", 100.0
+        job.result = result.model_dump_json()
+        await self._save(job)
+
+    async def _save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        await asyncio.to_thread(self._put, job)
+
+    def _put(self, job: Job) -> None:
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                tuple(getattr(job, c) for c in _COLUMNS),
+            )
+
+    def _get(self, task_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return Job(*row) if row else None
+
+    def _unfinished(self) -> List[Job]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        return [Job(*row) for row in rows]
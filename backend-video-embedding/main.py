@@ -1,21 +1,79 @@
-import os, asyncio
-from typing import Iterable, List, Optional
+import os, asyncio, time
+from contextlib import asynccontextmanager
+from typing import List, Optional
 from urllib.parse import urlparse
 import hashlib
 import re
 
-from fastapi import FastAPI, HTTPException
-from models import EmbedRequest, Clip, FactCheckResponse, EnrichedClip
+from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
+from models import EmbedRequest, Clip, FactCheckResponse, EnrichedClip, EmbedStatus, EmbedResponse
 import httpx
-from highlight_service import HighlightService, TLParams
+from highlight_service import HighlightService, TLParams, TEST_VIDEO_ID
+from rate_limiter import RateLimiter
+from video_registry import VideoRegistry
+from summary_cache import SummaryCache
+from jobs import JobManager, Job, ProgressFn, READY
+from projection import VIEW_PATTERN, parse_fields, project_fact_check
+from compression import CompressionMiddleware
+from fast_json import dumps, loads, splice
+from research_inprocess import InProcessFactChecker
+import metrics
+import tracing
+from tracing import TracingMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 
 RESEARCH_HOST = os.getenv("RESEARCH_HOST", "http://backend-research:8000")
 FACTCHECK_PATH = "/fact-check"                        # lives on backend-research
-FACTCHECK_TIMEOUT = float(os.getenv("FACTCHECK_TIMEOUT", "30"))
-FACTCHECK_RPS = int(os.getenv("FACTCHECK_RPS", "3"))  # <= 3 requests per second
+# Must outlast one research-side Exa call with retries (~EXA_RETRY_BUDGET + EXA_TIMEOUT = 45s)
+FACTCHECK_TIMEOUT = float(os.getenv("FACTCHECK_TIMEOUT", "60"))
+FACTCHECK_RPS = float(os.getenv("FACTCHECK_RPS", "3"))  # <= 3 requests per second
+FACTCHECK_BURST = int(os.getenv("FACTCHECK_BURST", "3"))
+FACTCHECK_MAX_IN_FLIGHT = int(os.getenv("FACTCHECK_MAX_IN_FLIGHT", "8"))
 HIGHLIGHTS_TIMEOUT = float(os.getenv("HIGHLIGHTS_TIMEOUT", "60"))
+VIDEO_REGISTRY_PATH = os.getenv(
+    "VIDEO_REGISTRY_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "video_registry.sqlite3"),
+)
+SUMMARY_CACHE_PATH = os.getenv(
+    "SUMMARY_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "highlight_cache.sqlite3"),
+)
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(30 * 24 * 3600)))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+EMBED_JOBS_PATH = os.getenv(
+    "EMBED_JOBS_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "embed_jobs.sqlite3"),
+)
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "4"))
+FACTCHECK_COMPACT_TEXT_CHARS = int(os.getenv("FACTCHECK_COMPACT_TEXT_CHARS", "280"))
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Each /fact-check body is validated against FactCheckResponse before it reaches the
+# browser. Opt in with 1 to splice research's JSON through undecoded (faster; only when
+# RESEARCH_HOST is a backend-research you deploy and trust to honour the same schema)
+FACTCHECK_TRUSTED = os.getenv("FACTCHECK_TRUSTED", "0").lower() in ("1", "true", "yes")
+# "http" POSTs each clip to RESEARCH_HOST; "inprocess" imports backend-research's
+# ExaService from RESEARCH_SRC_DIR and awaits it directly (single-node deployments)
+FACTCHECK_MODE = os.getenv("FACTCHECK_MODE", "http").lower()
+RESEARCH_SRC_DIR = os.getenv(
+    "RESEARCH_SRC_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend-research"),
+)
+FACTCHECK_CACHE_PATH = os.getenv(
+    "FACTCHECK_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "fact_check_cache.sqlite3"),
+)
+# Stage timing (see tracing.py): Server-Timing header, optional JSON-lines trace log,
+# optional pyinstrument profiles of requests slower than PROFILE_SLOW_MS
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "1").lower() in ("1", "true", "yes")
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "")
+TRACE_LOG_MIN_MS = float(os.getenv("TRACE_LOG_MIN_MS", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "data", "profiles"))
 
 PROMPT = (
     "Extract segments where someone is stating a fact or making a claim, showing "
@@ -27,7 +85,50 @@ TEMPERATURE = 0.5
 MODEL_OPTIONS = ["visual", "audio"]
 TEST_FLAG = True
 
-app = FastAPI(title="Embedding API", version="1.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the /embed worker pool (and resume unfinished jobs) and the fact-check pool for the app's lifetime."""
+    # One keep-alive pool to backend-research shared by every /highlights_enriched request
+    app.state.factcheck_client = httpx.AsyncClient(timeout=FACTCHECK_TIMEOUT)
+    if inprocess_factchecker is not None:
+        await inprocess_factchecker.start()
+    await embed_jobs.start()
+    try:
+        yield
+    finally:
+        await embed_jobs.stop()
+        if inprocess_factchecker is not None:
+            await inprocess_factchecker.stop()
+        await app.state.factcheck_client.aclose()
+
+
+app = FastAPI(title="Embedding API", version="1.1.0", lifespan=lifespan)
+
+# Shared by all requests so the RPS budget is enforced per worker, not per video
+factcheck_limiter = RateLimiter(
+    rate=FACTCHECK_RPS,
+    burst=FACTCHECK_BURST,
+    max_in_flight=FACTCHECK_MAX_IN_FLIGHT,
+)
+
+if FACTCHECK_MODE not in ("http", "inprocess"):
+    raise RuntimeError(f"FACTCHECK_MODE must be 'http' or 'inprocess', got {FACTCHECK_MODE!r}")
+inprocess_factchecker = (
+    InProcessFactChecker(RESEARCH_SRC_DIR, FACTCHECK_CACHE_PATH) if FACTCHECK_MODE == "inprocess" else None
+)
+metrics.LIMITER_WAITING.set_function(lambda: factcheck_limiter.waiting)
+metrics.LIMITER_IN_FLIGHT.set_function(lambda: factcheck_limiter.in_flight)
+
+# URL -> TwelveLabs index/video ids, so each video is only indexed once
+video_registry = VideoRegistry(VIDEO_REGISTRY_PATH)
+
+# (video_id, prompt, temperature, model) -> raw highlight list
+summary_cache = SummaryCache(
+    SUMMARY_CACHE_PATH,
+    ttl_seconds=SUMMARY_CACHE_TTL,
+    max_entries=SUMMARY_CACHE_MAX_ENTRIES,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +138,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if COMPRESSION_ENABLED:
+    # streamed events go out as-is; everything else is gzip/brotli by Accept-Encoding
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        exclude_prefixes=("/highlights_enriched/stream",),
+    )
+
+# Outermost, so Server-Timing covers compression too
+app.add_middleware(
+    TracingMiddleware,
+    service="embedding",
+    server_timing=SERVER_TIMING_ENABLED,
+    log_path=TRACE_LOG_PATH,
+    log_min_ms=TRACE_LOG_MIN_MS,
+    profile_slow_ms=PROFILE_SLOW_MS,
+    profile_dir=PROFILE_DIR,
+    profile_sample_rate=PROFILE_SAMPLE_RATE,
+)
+
 
 def _index_name_from_url(url: str, max_len: int = 63) -> str:
     """
@@ -57,101 +178,344 @@ def _index_name_from_url(url: str, max_len: int = 63) -> str:
     return name
 
 
+def _highlight_service(download_url: str, on_status=None) -> HighlightService:
+    params = TLParams(
+        video_url=download_url,
+        index_name=_index_name_from_url(download_url),
+        model_options=MODEL_OPTIONS,
+        test_flag=TEST_FLAG,
+    )
+    return HighlightService(
+        params,
+        registry=video_registry,
+        summary_cache=summary_cache,
+        on_status=on_status,
+    )
+
+
+async def _generate_clips(req: EmbedRequest) -> List[Clip]:
+    """Index the video (unless TEST_FLAG) and turn its highlights into clips."""
+    svc = _highlight_service(str(req.downloadUrl))
+    raw = await svc.run_async(prompt=PROMPT, temperature=TEMPERATURE)
+    return _clips_from_highlights(raw)
+
+
+def _clips_from_highlights(raw: List[dict]) -> List[Clip]:
+    clips: List[Clip] = []
+    for h in raw or []:
+        start = h.get("start_sec")
+        end = h.get("end_sec")
+        text = h.get("highlight_summary") or ""
+        if start is None or end is None or not text:
+            continue
+        clips.append(
+            Clip(startSec=float(start), endSec=float(end), description=text)
+        )
+    return clips
+
+
+@app.get("/health")
+@app.head("/health", include_in_schema=False)
+def health_check():
+    """Health check endpoint (RUN.md, test_embed.py and the benchmarks poll it)"""
+    return {"status": "healthy"}
+
+
 @app.post("/highlights", response_model=List[Clip])
-def create_highlights(req: EmbedRequest):
+async def create_highlights(req: EmbedRequest):
+    """Index the video and summarize its highlights through the async SDK client (never the blocking run())."""
     try:
-        index_name = _index_name_from_url(str(req.downloadUrl))
-        params = TLParams(
-            video_url=str(req.downloadUrl),
-            index_name=index_name,
-            model_options=MODEL_OPTIONS,
-            test_flag=TEST_FLAG,
-        )
-        svc = HighlightService(params)
-        raw = svc.run(prompt=PROMPT, temperature=TEMPERATURE)
-
-        clips: List[Clip] = []
-        for h in raw or []:
-            start = h.get("start_sec")
-            end = h.get("end_sec")
-            text = h.get("highlight_summary") or ""
-            if start is None or end is None or not text:
-                continue
-            clips.append(
-                Clip(startSec=float(start), endSec=float(end), description=text)
-            )
-        return clips
+        return await _generate_clips(req)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def chunked(seq: List, n: int) -> Iterable[List]:
-    for i in range(0, len(seq), n):
-        yield seq[i:i+n]
-
-async def call_factcheck(client: httpx.AsyncClient, clip: "Clip") -> Optional[FactCheckResponse]:
+async def call_factcheck(client: httpx.AsyncClient, clip: "Clip", view: str = "full") -> Optional[bytes]:
     """
     Calls backend-research /fact-check with the NEW request schema:
       { startSec, endSec, claim }
-    Maps response to FactCheckResponse (which includes startSec/endSec as well).
+    Returns the FactCheckResponse JSON (which includes startSec/endSec as well):
+    as received when FACTCHECK_TRUSTED, otherwise validated and re-serialized.
+    view="compact" asks research for the trimmed payload (no exaResponse, short source text).
+    With FACTCHECK_MODE=inprocess the research pipeline is awaited directly and `client` is unused.
     """
+    if inprocess_factchecker is not None:
+        try:
+            with tracing.span("factcheck"):
+                body = await inprocess_factchecker.fact_check(clip.startSec, clip.endSec, clip.description, view)
+        except Exception:
+            metrics.FACTCHECK_RESULTS.labels("error").inc()
+            return None
+        metrics.FACTCHECK_RESULTS.labels("ok").inc()
+        return body
     try:
         payload = {
             "startSec": clip.startSec,
             "endSec": clip.endSec,
             "claim": clip.description,
         }
-        resp = await client.post(f"{RESEARCH_HOST}{FACTCHECK_PATH}", json=payload)
+        params = {"view": view} if view != "full" else None
+        # The trace id rides along so research's trace log lines up with ours
+        headers = {"X-Trace-Id": tracing.current_id()} if tracing.current_id() else None
+        with metrics.track("research", FACTCHECK_PATH) as span, tracing.span("factcheck"):
+            resp = await client.post(f"{RESEARCH_HOST}{FACTCHECK_PATH}", json=payload, params=params,
+                                     headers=headers)
+            span.outcome = f"{resp.status_code // 100}xx"
+        tracing.add_remote(resp.headers.get("server-timing"), "research.")
         if resp.status_code >= 400:
+            metrics.FACTCHECK_RESULTS.labels("error").inc()
             return None
-        data = resp.json()
-        return FactCheckResponse(**data)
+        if FACTCHECK_TRUSTED:
+            body = resp.content or None
+        else:
+            try:
+                with tracing.span("validate"):
+                    body = _FACT_CHECK.dump_json(_FACT_CHECK.validate_json(resp.content))
+            except ValueError:
+                metrics.FACTCHECK_RESULTS.labels("invalid").inc()
+                return None
+        metrics.FACTCHECK_RESULTS.labels("ok" if body else "error").inc()
+        return body
     except Exception:
+        metrics.FACTCHECK_RESULTS.labels("error").inc()
         return None
+
+_FACT_CHECK = TypeAdapter(FactCheckResponse)
+
+def _enriched_json(clip: Clip, fact_check: Optional[bytes], view: str, fields: Optional[set]) -> bytes:
+    """One EnrichedClip as JSON, with the fact-check body spliced in (decoded only for `fields`)."""
+    if fact_check is not None and fields:
+        fact_check = dumps(project_fact_check(loads(fact_check), view, fields, FACTCHECK_COMPACT_TEXT_CHARS))
+    return splice({"clip": clip.model_dump()}, {"factCheck": fact_check or b"null"})
     
 @app.post("/highlights_enriched", response_model=List[EnrichedClip])
-async def create_highlights_enriched(req: "EmbedRequest"):
+async def create_highlights_enriched(
+    req: "EmbedRequest",
+    view: str = Query("full", pattern=VIEW_PATTERN),
+    fields: Optional[str] = None,
+):
     """
     1) Generate clips (same logic as /highlights)
     2) For each clip, call backend-research /fact-check with {startSec,endSec,claim}
-    3) Enforce ≤ 3 requests per second (FACTCHECK_RPS)
+    3) Start calls through the shared token bucket (FACTCHECK_RPS / FACTCHECK_BURST,
+       at most FACTCHECK_MAX_IN_FLIGHT outstanding)
     4) Return [{ clip, factCheck }, ...]
+
+    `view=compact` / `fields=a,b` trim each factCheck (see projection.py); compact
+    is requested from backend-research so the heavy fields never cross either hop.
     """
     # step 1: get clips
     try:
-        index_name = _index_name_from_url(str(req.downloadUrl))
-        params = TLParams(
-            video_url=str(req.downloadUrl),
-            index_name=index_name,
-            model_options=MODEL_OPTIONS,
-            test_flag=TEST_FLAG,
-        )
-        svc = HighlightService(params)
-        raw = svc.run(prompt=PROMPT, temperature=TEMPERATURE)
-
-        clips: List[Clip] = []
-        for h in raw or []:
-            start = h.get("start_sec")
-            end = h.get("end_sec")
-            text = h.get("highlight_summary") or ""
-            if start is None or end is None or not text:
-                continue
-            clips.append(Clip(startSec=float(start), endSec=float(end), description=text))
+        clips = await _generate_clips(req)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"highlights error: {e}")
 
     if not clips:
         return []
 
-    # step 2–3: rate-limit fact-check calls (batches of size FACTCHECK_RPS, ~1s between)
-    enriched: List[EnrichedClip] = []
-    async with httpx.AsyncClient(timeout=FACTCHECK_TIMEOUT) as client:
-        for batch in chunked(clips, max(1, FACTCHECK_RPS)):
-            tasks = [call_factcheck(client, c) for c in batch]
-            batch_results = await asyncio.gather(*tasks, return_exceptions=False)
-            for c, fc in zip(batch, batch_results):
-                enriched.append(EnrichedClip(clip=c, factCheck=fc))
+    field_set = parse_fields(fields)
+
+    # step 2–3: each call starts as soon as the limiter hands out a token
+    client: httpx.AsyncClient = app.state.factcheck_client
+
+    async def enrich(c: Clip) -> bytes:
+        async with factcheck_limiter.slot():
+            fc = await call_factcheck(client, c, view)
+        with tracing.span("encode"):
+            return _enriched_json(c, fc, view, field_set)
+
+    enriched = await asyncio.gather(*(enrich(c) for c in clips))
+
+    # Assembled from JSON fragments; FastAPI doesn't re-validate against the response_model
+    return Response(content=b"[" + b",".join(enriched) + b"]", media_type="application/json")
+
+
+def _stream_event(event: str, data: dict, sse: bool, raw: Optional[dict] = None) -> bytes:
+    if sse:
+        return b"event: " + event.encode("utf-8") + b"\ndata: " + splice(data, raw) + b"\n\n"
+    return splice({"event": event, **data}, raw) + b"\n"
+
+
+@app.post("/highlights_enriched/stream")
+async def create_highlights_enriched_stream(
+    req: EmbedRequest,
+    request: Request,
+    view: str = Query("full", pattern=VIEW_PATTERN),
+    fields: Optional[str] = None,
+):
+    """
+    Streaming variant of /highlights_enriched.
+
+    Emits newline-delimited JSON (or Server-Sent Events when the client sends
+    `Accept: text/event-stream`):
+      {"event": "clips", "clips": [...]}                         once clips are known
+      {"event": "factCheck", "seq": n, "index": i, "item": {...}} per clip, in completion order
+      {"event": "summary", "total": N, "factChecked": k, "failed": f, "elapsedSec": t}
+    Pending fact-checks are cancelled if the client disconnects.
+    `view` / `fields` trim each item's factCheck as in /highlights_enriched.
+    """
+    started = time.monotonic()
+    try:
+        clips = await _generate_clips(req)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"highlights error: {e}")
+
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    field_set = parse_fields(fields)
+
+    async def events():
+        yield _stream_event("clips", {"clips": [c.model_dump() for c in clips]}, sse)
+
+        checked = failed = 0
+        client: httpx.AsyncClient = app.state.factcheck_client
+
+        async def enrich(index: int, c: Clip):
+            async with factcheck_limiter.slot():
+                fc = await call_factcheck(client, c, view)
+            return index, c, fc
+
+        tasks = [asyncio.ensure_future(enrich(i, c)) for i, c in enumerate(clips)]
+        try:
+            for seq, done in enumerate(asyncio.as_completed(tasks)):
+                index, clip, fc = await done
+                if fc is None:
+                    failed += 1
+                else:
+                    checked += 1
+                yield _stream_event(
+                    "factCheck",
+                    {"seq": seq, "index": index},
+                    sse,
+                    raw={"item": _enriched_json(clip, fc, view, field_set)},
+                )
+                if await request.is_disconnected():
+                    return
+        finally:
+            # client went away (or the generator was closed): stop upstream work
+            for t in tasks:
+                t.cancel()
+
+        yield _stream_event("summary", {
+            "total": len(clips),
+            "factChecked": checked,
+            "failed": failed,
+            "elapsedSec": round(time.monotonic() - started, 3),
+        }, sse)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# TwelveLabs task status -> rough overall job progress
+_INDEXING_PROGRESS = {"validating": 10, "pending": 15, "queued": 20, "indexing": 40, "ready": 75}
+
+
+async def _run_embed_job(job: Job, progress: ProgressFn) -> EmbedResponse:
+    async def on_status(status: str) -> None:
+        await progress(f"indexing:{status}", _INDEXING_PROGRESS.get(status, 30))
+
+    svc = _highlight_service(job.download_url, on_status=on_status)
+    await progress("indexing", 5)
+    video_id = await svc.index_video()
+    await progress("summarizing", 80)
+    raw = await svc.summarize_highlights(video_id, prompt=PROMPT, temperature=TEMPERATURE)
+    record = await video_registry.lookup(svc.params.index_name)
+    return EmbedResponse(
+        taskId=job.task_id,
+        indexId=record.index_id if record else None,
+        videoId=video_id,
+        clips=_clips_from_highlights(raw),
+    )
+
+
+embed_jobs = JobManager(EMBED_JOBS_PATH, runner=_run_embed_job, workers=EMBED_WORKERS)
+metrics.EMBED_QUEUED.set_function(lambda: embed_jobs.queued)
+
+
+def _embed_status(job: Job) -> EmbedStatus:
+    return EmbedStatus(
+        taskId=job.task_id,
+        status=job.status,
+        progressPct=job.progress_pct,
+        stage=job.stage,
+        error=job.error,
+    )
+
+
+@app.post("/embed", response_model=EmbedStatus, status_code=202)
+async def submit_embed(req: EmbedRequest):
+    """Queue a video for indexing + highlight extraction; poll /embed/status/{taskId}."""
+    job = await embed_jobs.submit(str(req.downloadUrl))
+    return _embed_status(job)
+
+
+@app.get("/embed/status/{taskId}", response_model=EmbedStatus)
+async def embed_status(taskId: str):
+    job = await embed_jobs.get(taskId)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown taskId")
+    return _embed_status(job)
+
+
+@app.get("/embed/result/{taskId}", response_model=EmbedResponse)
+async def embed_result(taskId: str):
+    job = await embed_jobs.get(taskId)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown taskId")
+    if job.status != READY:
+        raise HTTPException(status_code=409, detail=_embed_status(job).model_dump())
+    return EmbedResponse.model_validate_json(job.result)
+
+
+@app.get("/highlights/cache")
+def highlights_cache_stats():
+    """Hit/miss counters for the highlight summary cache"""
+    return summary_cache.stats()
+
+
+@app.delete("/highlights/cache")
+async def invalidate_highlights_cache(videoId: Optional[str] = None, downloadUrl: Optional[str] = None):
+    """
+    Drop cached highlight summaries for one video (by TwelveLabs `videoId` or
+    by the `downloadUrl` it was indexed from), or for every video if neither
+    is given.
+    """
+    if downloadUrl and not videoId:
+        if TEST_FLAG:
+            videoId = TEST_VIDEO_ID
+        else:
+            record = await video_registry.lookup(_index_name_from_url(downloadUrl))
+            if record is None or not record.video_id:
+                return {"invalidated": 0}
+            videoId = record.video_id
+    return {"invalidated": await summary_cache.invalidate(videoId)}
+
+
+@app.get("/videos/registry")
+def video_registry_stats():
+    """Indexed-video counts by status and in-flight indexing runs"""
+    return video_registry.stats()
+
+
+@app.get("/factcheck/limiter")
+def factcheck_limiter_stats():
+    """Queue depth, in-flight count and wait times of the fact-check rate limiter"""
+    return factcheck_limiter.stats()
 
-            if len(enriched) < len(clips):
-                await asyncio.sleep(1.05)  # small cushion to stay under 3/sec
+@app.get("/factcheck/mode")
+def factcheck_mode():
+    """How clips are fact-checked; in-process mode also reports its cache counters"""
+    if inprocess_factchecker is None:
+        return {"mode": "http", "researchHost": RESEARCH_HOST}
+    return {"mode": "inprocess", "researchSrcDir": RESEARCH_SRC_DIR, "cache": inprocess_factchecker.stats()}
 
-    return enriched
\ No newline at end of file
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus exposition: upstream latency, limiter queue depth, fact-check outcomes"""
+    extra = inprocess_factchecker.metrics_registry() if inprocess_factchecker is not None else None
+    body, content_type = metrics.render(extra)
+    if body is None:
+        return Response("prometheus_client is not installed\n", status_code=503, media_type=content_type)
+    return Response(body, media_type=content_type)
\ No newline at end of file
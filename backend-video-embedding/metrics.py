@@ -0,0 +1,104 @@
+"""
+Prometheus metrics for the embedding service, served at GET /metrics.
+
+`track(upstream, operation)` times TwelveLabs SDK calls (index, task,
+summarize) and the per-clip fact-check calls to backend-research. Limiter and
+/embed queue gauges read live state when scraped. In FACTCHECK_MODE=inprocess
+the research pipeline's own `research_*` metrics are appended to the output.
+
+Metric names are prefixed `embedding_`. Without `prometheus_client` every
+metric is a no-op and /metrics answers 503.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        pass
+
+
+# TwelveLabs summarize takes seconds to a minute; indexing polls are quick but indexing itself is minutes
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, 300)
+
+if PROMETHEUS_AVAILABLE:
+    REGISTRY = CollectorRegistry()
+    UPSTREAM_SECONDS = Histogram(
+        "embedding_upstream_request_seconds", "Upstream call latency (TwelveLabs SDK calls, backend-research /fact-check)",
+        ["upstream", "operation", "outcome"], buckets=LATENCY_BUCKETS, registry=REGISTRY,
+    )
+    UPSTREAM_IN_FLIGHT = Gauge(
+        "embedding_upstream_in_flight", "Upstream calls currently running", ["upstream"], registry=REGISTRY,
+    )
+    FACTCHECK_RESULTS = Counter(
+        "embedding_factcheck_results", "Per-clip fact-check outcomes (ok, error, invalid = failed schema validation)",
+        ["result"], registry=REGISTRY,
+    )
+    LIMITER_WAITING = Gauge(
+        "embedding_factcheck_limiter_waiting", "Fact-check calls queued for a rate-limiter slot", registry=REGISTRY,
+    )
+    LIMITER_IN_FLIGHT = Gauge(
+        "embedding_factcheck_limiter_in_flight", "Fact-check calls holding a rate-limiter slot", registry=REGISTRY,
+    )
+    EMBED_QUEUED = Gauge(
+        "embedding_embed_jobs_queued", "/embed jobs waiting for a worker", registry=REGISTRY,
+    )
+else:
+    REGISTRY = None
+    UPSTREAM_SECONDS = UPSTREAM_IN_FLIGHT = FACTCHECK_RESULTS = _NoopMetric()
+    LIMITER_WAITING = LIMITER_IN_FLIGHT = EMBED_QUEUED = _NoopMetric()
+
+
+class Span:
+    """Handle yielded by `track`; set `outcome` to override the default ok/error."""
+
+    def __init__(self):
+        self.outcome: Optional[str] = None
+
+
+@contextmanager
+def track(upstream: str, operation: str) -> Iterator[Span]:
+    span = Span()
+    in_flight = UPSTREAM_IN_FLIGHT.labels(upstream)
+    in_flight.inc()
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield span
+        outcome = "ok"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        in_flight.dec()
+        UPSTREAM_SECONDS.labels(upstream, operation, span.outcome or outcome).observe(time.perf_counter() - started)
+
+
+def render(extra=None) -> Tuple[Optional[bytes], str]:
+    """(exposition body, content type); `extra` is another registry to append (in-process research)."""
+    if not PROMETHEUS_AVAILABLE:
+        return None, "text/plain"
+    body = generate_latest(REGISTRY)
+    if extra is not None:
+        body += generate_latest(extra)
+    return body, CONTENT_TYPE_LATEST
@@ -16,11 +16,13 @@ class EmbedStatus(BaseModel):
     taskId: str
     status: str
     progressPct: Optional[float] = 0
+    stage: Optional[str] = None
+    error: Optional[str] = None
 
 
 class EmbedResponse(BaseModel):
     taskId: str
-    indexId: str
+    indexId: Optional[str] = None  # None when TEST_FLAG skips indexing
     videoId: str
     clips: List[Clip] = Field(default_factory=list)
 
@@ -78,6 +80,9 @@ class FactCheckResponse(BaseModel):
     response: str
     sources: List[AnswerCitation] = []
     exaResponse: Optional[ExaAnswerResponse] = None
+    cached: bool = False
+    similarity: Optional[float] = None
+    matchedClaim: Optional[str] = None
 
 class EnrichedClip(BaseModel):
     clip: Clip
@@ -0,0 +1,89 @@
+"""
+Async rate limiting for outbound fact-check calls.
+
+TokenBucket controls how fast calls may *start* (rate + burst); the
+RateLimiter pairs it with a max-in-flight cap so a slow tail never stops new
+calls from starting while tokens are available, and slow calls can't pile up
+without bound either.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+import tracing
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # FIFO: waiters are served in arrival order
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int, max_in_flight: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_in_flight = max(1, max_in_flight)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.waiting = 0
+        self.in_flight = 0
+        self.started = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a concurrency slot, then a token, and hold the slot for the call."""
+        queued_at = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self.bucket.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        wait = time.monotonic() - queued_at
+        tracing.record("limiter.wait", wait)
+        self.started += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            "rate": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "maxInFlight": self.max_in_flight,
+            "waiting": self.waiting,
+            "inFlight": self.in_flight,
+            "started": self.started,
+            "avgWaitSec": round(self.total_wait / self.started, 4) if self.started else 0.0,
+            "maxWaitSec": round(self.max_wait, 4),
+        }
@@ -0,0 +1,139 @@
+"""
+In-process fact-checking (FACTCHECK_MODE=inprocess).
+
+Instead of POSTing every clip to backend-research, import its ExaService
+pipeline from RESEARCH_SRC_DIR and await it directly, with the same pooled
+Exa client, result cache, near-duplicate index and in-flight coalescing that
+the research service sets up in its lifespan.
+
+Both services have top-level modules named `models` and `settings`, so the
+research modules are imported with those names temporarily swapped out of
+sys.modules and are kept only as references afterwards.
+"""
+import asyncio
+import importlib
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from fast_json import dumps
+from projection import project_fact_check
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Every backend-research module the fact-check pipeline imports (directly or transitively);
+# docker-compose.yml mounts exactly these into the container
+_RESEARCH_MODULES = (
+    "settings", "models", "http_clients", "fact_check_cache", "claim_index",
+    "metrics", "tracing", "singleflight", "resilience", "answer_stream", "exa_service",
+)
+
+
+@contextmanager
+def _research_import_scope(src_dir: str) -> Iterator[None]:
+    saved = {name: sys.modules.pop(name) for name in _RESEARCH_MODULES if name in sys.modules}
+    sys.path.insert(0, src_dir)
+    # research settings require RAPIDAPI_KEY, which the fact-check pipeline never uses
+    placeholder_key = "RAPIDAPI_KEY" not in os.environ
+    if placeholder_key:
+        os.environ["RAPIDAPI_KEY"] = "unused"
+    try:
+        yield
+    finally:
+        if placeholder_key:
+            os.environ.pop("RAPIDAPI_KEY", None)
+        sys.path.remove(src_dir)
+        for name in _RESEARCH_MODULES:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+def load_research_modules(src_dir: str) -> Dict[str, object]:
+    src_dir = os.path.abspath(src_dir)
+    if not os.path.isfile(os.path.join(src_dir, "exa_service.py")):
+        raise RuntimeError(f"RESEARCH_SRC_DIR={src_dir} does not contain backend-research")
+    with _research_import_scope(src_dir):
+        return {name: importlib.import_module(name) for name in _RESEARCH_MODULES}
+
+
+class InProcessFactChecker:
+    def __init__(self, src_dir: str, cache_path: str):
+        self.src_dir = src_dir
+        self.cache_path = cache_path
+        self._mods: Dict[str, object] = {}
+        self.settings = None
+        self.client = None
+        self.cache = None
+        self.claim_index = None
+        self.inflight = None
+        self.resilience = None
+
+    async def start(self) -> None:
+        """Mirror backend-research's lifespan: Exa pool, result cache, claim index."""
+        self._mods = load_research_modules(self.src_dir)
+        settings = self.settings = self._mods["settings"].settings
+        self.client = self._mods["http_clients"].build_exa_client(settings)
+        self.resilience = self._mods["http_clients"].build_exa_resilience(settings)
+        self.inflight = self._mods["singleflight"].SingleFlight()
+        research_metrics = self._mods["metrics"]
+        research_metrics.FACTCHECK_IN_FLIGHT.set_function(lambda: self.inflight.stats()["inFlight"])
+        research_metrics.EXA_CIRCUIT_OPEN.set_function(lambda: self.resilience.breaker.state != "closed")
+        if settings.FACTCHECK_CACHE_ENABLED:
+            self.cache = self._mods["fact_check_cache"].FactCheckCache(
+                path=self.cache_path,
+                ttl_seconds=settings.FACTCHECK_CACHE_TTL,
+                memory_size=settings.FACTCHECK_CACHE_MEMORY_SIZE,
+                disk_size=settings.FACTCHECK_CACHE_DISK_SIZE,
+            )
+            if settings.FACTCHECK_SIMILARITY_ENABLED:
+                self.claim_index = self._mods["claim_index"].ClaimIndex(
+                    path=self.cache_path,
+                    threshold=settings.FACTCHECK_SIMILARITY_THRESHOLD,
+                    num_perm=settings.FACTCHECK_SIMILARITY_NUM_PERM,
+                )
+                await asyncio.to_thread(self.claim_index.load)
+        logger.info("in-process fact-checking from %s (cache: %s)", self.src_dir, self.cache_path or "memory")
+
+    async def stop(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+        if self.cache is not None:
+            self.cache.close()
+        if self.claim_index is not None:
+            self.claim_index.close()
+
+    async def fact_check(self, start_sec: float, end_sec: float, claim: str, view: str = "full") -> bytes:
+        """Same JSON body backend-research's /fact-check would return. Raises on failure."""
+        service = self._mods["exa_service"].ExaService(
+            client=self.client,
+            cache=self.cache,
+            claim_index=self.claim_index,
+            inflight=self.inflight,
+            resilience=self.resilience,
+        )
+        # Research's spans (cache, exa, parse, ...) land in this request's trace as research.*
+        with self._mods["tracing"].bind(tracing.current(), "research."):
+            result = await service.fact_check_claim(claim)
+        result = result.model_copy(update={"startSec": start_sec, "endSec": end_sec})
+        if view == "full":
+            return result.model_dump_json().encode("utf-8")
+        return dumps(project_fact_check(result.model_dump(mode="json"), view, None,
+                                        self.settings.FACTCHECK_COMPACT_TEXT_CHARS))
+
+    def metrics_registry(self):
+        """backend-research's Prometheus registry (Exa latency, cost, cache outcomes); None before start."""
+        return self._mods["metrics"].REGISTRY if self._mods else None
+
+    def stats(self) -> Optional[dict]:
+        if self.cache is None:
+            return {"enabled": False, "inflight": self.inflight.stats(), "upstream": self.resilience.stats()}
+        return {
+            "enabled": True,
+            **self.cache.stats(),
+            "similarity": self.claim_index.stats() if self.claim_index is not None else None,
+            "inflight": self.inflight.stats(),
+            "upstream": self.resilience.stats(),
+        }
@@ -0,0 +1,139 @@
+"""
+Cache of raw TwelveLabs highlight lists.
+
+Keyed on (video_id, sha256(prompt), temperature, model_name) so re-opening a
+video with the fixed PROMPT/TEMPERATURE skips the summarize call. A small
+in-memory LRU sits in front of a SQLite table; entries expire after a TTL
+and the table is trimmed to max_entries by last access.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def summary_key(video_id: str, prompt: str, temperature: float, model_name: str) -> str:
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    return f"{video_id}:{prompt_hash}:{temperature:g}:{model_name}"
+
+
+class SummaryCache:
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, memory_size: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.memory_size = max(0, memory_size)
+        self._memory: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS highlight_summaries (
+                key TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                highlights TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS highlight_summaries_video ON highlight_summaries (video_id)")
+
+    async def get(self, key: str) -> Optional[List[Dict]]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] > now:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self._memory.pop(key, None)
+
+        row = await asyncio.to_thread(self._disk_get, key, now)
+        if row is None:
+            self.misses += 1
+            return None
+        expires_at, highlights = row[0], json.loads(row[1])
+        self._remember(key, expires_at, highlights)
+        self.hits += 1
+        return highlights
+
+    async def set(self, key: str, video_id: str, highlights: List[Dict]) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._remember(key, expires_at, highlights)
+        await asyncio.to_thread(self._disk_set, key, video_id, json.dumps(highlights), now, expires_at)
+
+    async def invalidate(self, video_id: Optional[str] = None) -> int:
+        """Drop cached summaries for one video, or everything when video_id is None."""
+        if video_id is None:
+            self._memory.clear()
+        else:
+            for key in [k for k in self._memory if k.startswith(f"{video_id}:")]:
+                del self._memory[key]
+        return await asyncio.to_thread(self._disk_delete, video_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM highlight_summaries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": count, "memoryEntries": len(self._memory)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _remember(self, key: str, expires_at: float, highlights: List[Dict]) -> None:
+        if not self.memory_size:
+            return
+        self._memory[key] = (expires_at, highlights)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires_at, highlights FROM highlight_summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                self._db.execute("DELETE FROM highlight_summaries WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE highlight_summaries SET accessed_at = ? WHERE key = ?", (now, key))
+            return row
+
+    def _disk_set(self, key: str, video_id: str, highlights: str, now: float, expires_at: float) -> None:
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO highlight_summaries (key, video_id, highlights, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, video_id, highlights, expires_at, now),
+            )
+            self._db.execute("DELETE FROM highlight_summaries WHERE expires_at <= ?", (now,))
+            self._db.execute(
+                """
+                DELETE FROM highlight_summaries WHERE key IN (
+                    SELECT key FROM highlight_summaries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def _disk_delete(self, video_id: Optional[str]) -> int:
+        with self._lock:
+            if video_id is None:
+                cur = self._db.execute("DELETE FROM highlight_summaries")
+            else:
+                cur = self._db.execute("DELETE FROM highlight_summaries WHERE video_id = ?", (video_id,))
+            return cur.rowcount
@@ -0,0 +1,104 @@
+import importlib
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+HIGHLIGHTS = [
+    {"start_sec": 0, "end_sec": 5, "highlight": "a", "highlight_summary": "Unemployment fell to 3.5% in 2023."},
+    {"start_sec": 9, "end_sec": 14, "highlight": "b", "highlight_summary": "The bridge cost 2 billion dollars."},
+]
+VIDEO = {"downloadUrl": "https://example.com/v.mp4"}
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    data = tmp_path_factory.mktemp("data")
+    env = pytest.MonkeyPatch()
+    for name in ("VIDEO_REGISTRY_PATH", "SUMMARY_CACHE_PATH", "EMBED_JOBS_PATH", "FACTCHECK_CACHE_PATH"):
+        env.setenv(name, str(data / f"{name.lower()}.sqlite3"))
+    env.setenv("TWELVELABS_API_KEY", "test")
+    env.setenv("FACTCHECK_MODE", "http")
+    env.setenv("FACTCHECK_RPS", "1000")
+    env.setenv("FACTCHECK_BURST", "1000")
+    yield importlib.import_module("main")
+    env.undo()
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    def blocking_run(self, prompt, temperature):
+        raise AssertionError("the blocking HighlightService.run() must not be used by the HTTP routes")
+
+    async def run_async(self, prompt, temperature):
+        return HIGHLIGHTS
+
+    monkeypatch.setattr(app_module.HighlightService, "run", blocking_run)
+    monkeypatch.setattr(app_module.HighlightService, "run_async", run_async)
+    with TestClient(app_module.app) as tc:
+        yield tc
+
+
+def test_highlights_uses_async_service(client):
+    response = client.post("/highlights", json=VIDEO)
+    assert response.status_code == 200
+    assert [(c["startSec"], c["endSec"]) for c in response.json()] == [(0.0, 5.0), (9.0, 14.0)]
+
+
+def _fact_check(body, **overrides):
+    return {
+        "startSec": body["startSec"], "endSec": body["endSec"], "title": "Jobs report",
+        "description": body["claim"], "truthfulnessScore": 4, "response": "Mostly accurate.",
+        "sources": [{"id": "s1", "url": "https://example.com/s1", "title": "Source", "text": "..."}],
+        **overrides,
+    }
+
+
+def _fake_research(app_module, make_body):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=make_body(json.loads(request.content)))
+
+    # The lifespan-owned client; route its requests to a fake backend-research
+    app_module.app.state.factcheck_client._transport = httpx.MockTransport(handler)
+
+
+def test_enriched_validates_research_responses_by_default(app_module, client):
+    assert app_module.FACTCHECK_TRUSTED is False
+    _fake_research(app_module, _fact_check)
+    items = client.post("/highlights_enriched", json=VIDEO).json()
+    assert [item["factCheck"]["response"] for item in items] == ["Mostly accurate."] * 2
+    assert items[0]["factCheck"]["sources"][0]["url"] == "https://example.com/s1"
+
+
+def test_enriched_drops_fact_checks_that_break_the_schema(app_module, client):
+    # "analysis" is not a FactCheckResponse field and the required "response" is missing
+    _fake_research(app_module, lambda body: {k: v for k, v in _fact_check(body, analysis="x").items()
+                                             if k != "response"})
+    items = client.post("/highlights_enriched", json=VIDEO).json()
+    assert [item["factCheck"] for item in items] == [None, None]
+    assert [item["clip"]["startSec"] for item in items] == [0.0, 9.0]
+
+
+def test_trusted_mode_is_opt_in_pass_through(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "FACTCHECK_TRUSTED", True)
+    _fake_research(app_module, lambda body: _fact_check(body, extra="kept"))
+    items = client.post("/highlights_enriched", json=VIDEO).json()
+    assert [item["factCheck"]["extra"] for item in items] == ["kept", "kept"]
+
+
+def test_enriched_routes_reuse_the_lifespan_client(app_module, client):
+    lifespan_client = app_module.app.state.factcheck_client
+    calls = []
+
+    def record(body):
+        calls.append(body["claim"])
+        return _fact_check(body)
+
+    _fake_research(app_module, record)
+    client.post("/highlights_enriched", json=VIDEO)
+    lines = client.post("/highlights_enriched/stream", json=VIDEO).text.splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["clips", "factCheck", "factCheck", "summary"]
+    assert len(calls) == 4
+    assert app_module.app.state.factcheck_client is lifespan_client
+    assert not lifespan_client.is_closed
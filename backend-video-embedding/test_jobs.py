@@ -0,0 +1,69 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from jobs import READY, JobManager
+
+
+class Result(BaseModel):
+    url: str
+
+
+async def _runner(job, progress):
+    await progress("working", 50)
+    return Result(url=job.download_url)
+
+
+async def _wait_ready(manager, task_id):
+    for _ in range(200):
+        job = await manager.get(task_id)
+        if job.status == READY:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {task_id} never finished")
+
+
+def test_manager_can_be_started_again_after_stop(tmp_path):
+    manager = JobManager(str(tmp_path / "jobs.sqlite3"), runner=_runner, workers=2)
+
+    async def cycle(url):
+        await manager.start()
+        try:
+            job = await manager.submit(url)
+            return await _wait_ready(manager, job.task_id)
+        finally:
+            await manager.stop()
+
+    # Each asyncio.run is a new event loop, like a second lifespan or test client
+    first = asyncio.run(cycle("https://example.com/a.mp4"))
+    second = asyncio.run(cycle("https://example.com/b.mp4"))
+    assert first.result == '{"url":"https://example.com/a.mp4"}'
+    assert second.result == '{"url":"https://example.com/b.mp4"}'
+    assert manager.queued == 0
+
+
+def test_unfinished_jobs_resume_on_next_start(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    blocked = JobManager(path, runner=_runner, workers=1)
+
+    async def submit_without_running():
+        await blocked.start()
+        for task in blocked._tasks:
+            task.cancel()
+        job = await blocked.submit("https://example.com/c.mp4")
+        await blocked.stop()
+        return job.task_id
+
+    task_id = asyncio.run(submit_without_running())
+
+    async def resume():
+        manager = JobManager(path, runner=_runner, workers=1)
+        resumed = await manager.start()
+        try:
+            return resumed, await _wait_ready(manager, task_id)
+        finally:
+            await manager.stop()
+
+    resumed, job = asyncio.run(resume())
+    assert resumed == 1
+    assert job.status == READY
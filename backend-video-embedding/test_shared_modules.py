@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESEARCH_DIR = os.path.join(HERE, "..", "backend-research")
+
+# Modules both services ship a copy of (separate Docker build contexts); see their docstrings
+SHARED = ["compression", "tracing"]
+
+
+@pytest.mark.parametrize("name", SHARED)
+def test_copies_match_backend_research(name):
+    theirs = os.path.join(RESEARCH_DIR, f"{name}.py")
+    if not os.path.isfile(theirs):
+        pytest.skip("backend-research is not checked out next to this service")
+    with open(os.path.join(HERE, f"{name}.py"), "rb") as ours_file, open(theirs, "rb") as theirs_file:
+        assert ours_file.read() == theirs_file.read(), f"{name}.py differs from backend-research/{name}.py"
@@ -0,0 +1,101 @@
+"""
+Persistent registry of indexed videos.
+
+Maps the deterministic per-URL index name (see _index_name_from_url in
+main.py) to the TwelveLabs index/task/video ids and the task status, so a
+video is indexed once and later requests go straight to summarize. Progress
+is checkpointed after every step, which lets a restarted process resume
+polling an existing task instead of uploading again, and concurrent requests
+for the same video in one process share a single in-flight indexing run.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+
+@dataclass
+class VideoRecord:
+    key: str
+    video_url: str
+    index_id: Optional[str] = None
+    task_id: Optional[str] = None
+    video_id: Optional[str] = None
+    status: str = "new"  # new | index_created | indexing | ready | failed
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+
+_COLUMNS = ("key", "video_url", "index_id", "task_id", "video_id", "status", "error", "updated_at")
+
+
+class VideoRegistry:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS videos (
+                key TEXT PRIMARY KEY,
+                video_url TEXT NOT NULL,
+                index_id TEXT,
+                task_id TEXT,
+                video_id TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.attached = 0
+
+    async def lookup(self, key: str) -> Optional[VideoRecord]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def save(self, record: VideoRecord) -> None:
+        record.updated_at = time.time()
+        await asyncio.to_thread(self._put, record)
+
+    async def single_flight(self, key: str, run: Callable[[], Awaitable[str]]) -> str:
+        """
+        Run `run` once per key at a time; concurrent callers await the same task.
+        The task is shielded so one caller disconnecting doesn't abort indexing
+        for the others (or for the next request).
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(run())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            self.attached += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM videos GROUP BY status").fetchall()
+        return {"videos": dict(rows), "inFlight": len(self._inflight), "attached": self.attached}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _get(self, key: str) -> Optional[VideoRecord]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM videos WHERE key = ?", (key,)
+            ).fetchone()
+        return VideoRecord(*row) if row else None
+
+    def _put(self, record: VideoRecord) -> None:
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO videos ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                tuple(getattr(record, c) for c in _COLUMNS),
+            )
@@ -0,0 +1,177 @@
+"""
+Local stand-ins for Exa, TwelveLabs and the RapidAPI downloader.
+
+    python -m uvicorn fake_upstreams:app --app-dir benchmarks --port 9100
+
+One app serves all three under a prefix, matching what the services call:
+
+  /exa          POST /answer (plain JSON, or SSE with "stream": true)   -> EXA_BASE_URL
+  /twelvelabs   POST /indexes, POST /tasks, GET /tasks/{id},
+                POST /summarize                                        -> TWELVELABS_BASE_URL
+  /rapidapi     POST /download, GET /status/{id}, GET /file/{id}/{f}    -> RAPIDAPI_BASE_URL
+
+Each upstream gets a latency distribution (log-normal around a median), an
+error rate and payload sizes from the JSON in FAKE_UPSTREAMS_CONFIG, merged
+over DEFAULT_CONFIG (run_bench.py builds it from its command line). Every
+answer and highlight carries a counter, so claims never repeat and nothing is
+served from the services' caches unless the benchmark asks for it.
+"""
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+from typing import Dict
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_CONFIG: Dict[str, Dict] = {
+    "exa": {"latency_ms": 800, "sigma": 0.4, "error_rate": 0.0, "citations": 5, "text_chars": 2000},
+    "twelvelabs": {"latency_ms": 1500, "sigma": 0.3, "error_rate": 0.0, "highlights": 8},
+    "rapidapi": {"latency_ms": 150, "sigma": 0.3, "error_rate": 0.0, "file_bytes": 1024 * 1024},
+}
+
+# Status codes the fakes fail with; all are ones the services treat as transient
+ERROR_STATUSES = (429, 500, 502, 503)
+FILE_CHUNK = 64 * 1024
+
+
+def load_config() -> Dict[str, Dict]:
+    config = {name: dict(values) for name, values in DEFAULT_CONFIG.items()}
+    for name, values in json.loads(os.getenv("FAKE_UPSTREAMS_CONFIG", "{}")).items():
+        config.setdefault(name, {}).update(values)
+    return config
+
+
+CONFIG = load_config()
+_counter = itertools.count(1)
+app = FastAPI(title="Fake upstreams")
+
+
+async def _delay(upstream: str) -> None:
+    cfg = CONFIG[upstream]
+    median = cfg["latency_ms"] / 1000
+    if median > 0:
+        await asyncio.sleep(median * math.exp(random.gauss(0, cfg["sigma"])))
+
+
+def _error(upstream: str):
+    if random.random() < CONFIG[upstream]["error_rate"]:
+        return JSONResponse({"error": f"injected {upstream} failure"}, status_code=random.choice(ERROR_STATUSES))
+    return None
+
+
+# --- Exa ---------------------------------------------------------------------
+
+def _exa_answer(claim: str) -> Dict:
+    cfg = CONFIG["exa"]
+    text = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (cfg["text_chars"] // 57 + 1))
+    citations = [
+        {
+            "id": f"https://example.com/{i}", "url": f"https://example.com/{i}", "title": f"Source {i}",
+            "author": "Reporter", "publishedDate": "2024-05-01T00:00:00.000Z", "text": text[:cfg["text_chars"]],
+        }
+        for i in range(cfg["citations"])
+    ]
+    n = next(_counter)
+    answer = (f"TITLE: Claim {n}\nDESCRIPTION: What the speaker said about {claim[:60]}\nSCORE: {n % 5 + 1}\n"
+              "ANALYSIS: Several sources discuss this claim in detail.")
+    return {"answer": answer, "citations": citations, "costDollars": {"total": 0.005}}
+
+
+@app.post("/exa/answer")
+async def exa_answer(request: Request):
+    body = await request.json()
+    await _delay("exa")
+    error = _error("exa")
+    if error is not None:
+        return error
+    claim = body.get("query", "").rsplit("Claim to fact-check:", 1)[-1].strip()
+    data = _exa_answer(claim)
+    if not body.get("stream"):
+        return data
+
+    async def events():
+        words = data["answer"].split(" ")
+        for i in range(0, len(words), 4):
+            chunk = " ".join(words[i:i + 4]) + ("" if i + 4 >= len(words) else " ")
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n\n"
+            await asyncio.sleep(0)
+        yield f"data: {json.dumps({'citations': data['citations'], 'costDollars': data['costDollars']})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# --- TwelveLabs --------------------------------------------------------------
+
+@app.post("/twelvelabs/indexes")
+async def tl_create_index():
+    await _delay("twelvelabs")
+    return _error("twelvelabs") or JSONResponse({"_id": f"idx{next(_counter)}"}, status_code=201)
+
+
+@app.post("/twelvelabs/tasks")
+async def tl_create_task():
+    await _delay("twelvelabs")
+    n = next(_counter)
+    return _error("twelvelabs") or JSONResponse({"_id": f"task{n}", "video_id": f"vid{n}"}, status_code=201)
+
+
+@app.get("/twelvelabs/tasks/{task_id}")
+async def tl_task(task_id: str):
+    return {"_id": task_id, "index_id": "idx", "video_id": f"vid-{task_id}", "status": "ready"}
+
+
+@app.post("/twelvelabs/summarize")
+async def tl_summarize():
+    await _delay("twelvelabs")
+    error = _error("twelvelabs")
+    if error is not None:
+        return error
+    n = next(_counter)
+    highlights = [
+        {"start_sec": 10 * i, "end_sec": 10 * i + 7, "highlight": f"Highlight {i}",
+         "highlight_summary": f"The speaker claims figure {n}-{i} grew by {i + 2}% last year."}
+        for i in range(CONFIG["twelvelabs"]["highlights"])
+    ]
+    return {"id": f"sum{n}", "summarize_type": "highlight", "highlights": highlights}
+
+
+# --- RapidAPI downloader -----------------------------------------------------
+
+@app.post("/rapidapi/download")
+async def rapid_download():
+    await _delay("rapidapi")
+    return _error("rapidapi") or {"jobId": f"job{next(_counter)}"}
+
+
+@app.get("/rapidapi/status/{job_id}")
+async def rapid_status(job_id: str):
+    await _delay("rapidapi")
+    return _error("rapidapi") or {"status": "ready", "filename": f"{job_id}.mp4"}
+
+
+@app.get("/rapidapi/file/{job_id}/{filename}")
+async def rapid_file(job_id: str, filename: str):
+    await _delay("rapidapi")
+    error = _error("rapidapi")
+    if error is not None:
+        return error
+    size = CONFIG["rapidapi"]["file_bytes"]
+    # Distinct content per job so the content-addressed store keeps every file
+    seed = f"{job_id}/{filename}".encode().ljust(64, b".")
+    block = (seed * (FILE_CHUNK // len(seed) + 1))[:FILE_CHUNK]
+
+    async def body():
+        for offset in range(0, size, FILE_CHUNK):
+            yield block[:min(FILE_CHUNK, size - offset)]
+
+    return StreamingResponse(body(), media_type="video/mp4", headers={"Content-Length": str(size)})
+
+
+@app.get("/health")
+def health() -> Response:
+    return Response("ok")
@@ -0,0 +1,81 @@
+"""
+Closed-loop HTTP load driver.
+
+`run_load` keeps `concurrency` requests outstanding until `requests` have
+completed and returns per-request latencies; `summarize` turns them into
+throughput and latency percentiles. Used by run_bench.py.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+# Builds the i-th request: (method, path, json body or None)
+RequestFactory = Callable[[int], tuple]
+
+
+@dataclass
+class LoadResult:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    seconds: float = 0.0
+    first_error: Optional[str] = None
+
+
+async def run_load(client: httpx.AsyncClient, make_request: RequestFactory, concurrency: int,
+                   requests: int) -> LoadResult:
+    result = LoadResult()
+    next_index = iter(range(requests))
+
+    async def worker() -> None:
+        for i in next_index:
+            method, path, body = make_request(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = 0
+                result.first_error = result.first_error or f"{type(e).__name__}: {e}"
+            result.latencies.append(time.perf_counter() - started)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+            if not 200 <= status < 300:
+                result.errors += 1
+                if status and result.first_error is None:
+                    result.first_error = f"HTTP {status}: {response.text[:200]}"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def percentile(ordered: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(result: LoadResult) -> Dict:
+    ordered = sorted(result.latencies)
+    ms = lambda value: round(value * 1000, 2) if value is not None else None  # noqa: E731
+    completed = len(ordered)
+    return {
+        "requests": completed,
+        "ok": completed - result.errors,
+        "errors": result.errors,
+        "statuses": {str(k): v for k, v in sorted(result.statuses.items())},
+        "seconds": round(result.seconds, 3),
+        "throughput": round((completed - result.errors) / result.seconds, 2) if result.seconds else 0.0,
+        "p50Ms": ms(percentile(ordered, 50)),
+        "p95Ms": ms(percentile(ordered, 95)),
+        "p99Ms": ms(percentile(ordered, 99)),
+        "maxMs": ms(ordered[-1] if ordered else None),
+        "firstError": result.first_error,
+    }
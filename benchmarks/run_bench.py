@@ -0,0 +1,341 @@
+"""
+Offline load benchmark of both services against local fake upstreams.
+
+    python benchmarks/run_bench.py [--scenarios fact-check,highlights-enriched,download-file]
+                                   [--concurrency 1,8,32] [--requests 100]
+                                   [--exa-latency-ms 800] [--exa-error-rate 0.02] [--tl-latency-ms 1500] ...
+                                   [--compare benchmarks/results/<earlier run>.json]
+
+Starts fake_upstreams.py, backend-research and backend-video-embedding with
+uvicorn on free local ports (no API keys, no credits). Each service is pointed
+at the fakes through EXA_BASE_URL, RAPIDAPI_BASE_URL and TWELVELABS_BASE_URL,
+and its databases and video files go to a temporary directory. Each scenario
+is then run at every concurrency level:
+
+  fact-check            POST research /fact-check, one new claim per request
+  highlights-enriched   POST embedding /highlights_enriched (TwelveLabs summarize + per-clip fact-checks)
+  download-file         GET research /downloadFile/{jobId}/{filename}, a new file per request
+
+For each level the run reports throughput, p50/p95/p99 latency and the peak
+RSS of each service. Peak RSS is read from /proc VmHWM and is reset before
+every level, so it is only reported on Linux.
+
+Caches are off unless --cached is given; --cached cycles over a few claims to
+measure the hit path. The embedding fact-check rate limit is lifted unless
+--factcheck-rps is given, so the run measures the pipeline, not the 3 RPS
+budget.
+
+Results are written to benchmarks/results/<UTC time>-<commit>.json.
+--compare prints the change against an earlier file. It exits 1 when p95
+grows, or throughput drops, by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadgen import run_load, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+RESEARCH_DIR = os.path.join(ROOT, "backend-research")
+EMBEDDING_DIR = os.path.join(ROOT, "backend-video-embedding")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+SCENARIOS = ("fact-check", "highlights-enriched", "download-file")
+STARTUP_TIMEOUT = 60.0
+CACHED_CLAIMS = 20
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Service:
+    """One uvicorn process; stderr goes to a log file that is shown if it fails to start."""
+
+    def __init__(self, name: str, app_dir: str, module: str, env: Dict[str, str], workdir: str):
+        self.name = name
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.log_path = os.path.join(workdir, f"{name}.log")
+        self._log = open(self.log_path, "w")
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", module, "--app-dir", app_dir,
+             "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning", "--no-access-log"],
+            env={**os.environ, **env}, cwd=workdir, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self) -> None:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                break
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self._log.flush()
+        with open(self.log_path) as f:
+            tail = f.read()[-3000:]
+        raise RuntimeError(f"{self.name} did not start (see {self.log_path}):\n{tail}")
+
+    def reset_peak_rss(self) -> None:
+        try:
+            with open(f"/proc/{self.proc.pid}/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+    def peak_rss_mb(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.proc.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+        return None
+
+    def close(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self._log.close()
+
+
+def upstream_config(args) -> Dict[str, Dict]:
+    return {
+        "exa": {"latency_ms": args.exa_latency_ms, "sigma": args.latency_sigma, "error_rate": args.exa_error_rate,
+                "citations": args.citations, "text_chars": args.text_chars},
+        "twelvelabs": {"latency_ms": args.tl_latency_ms, "sigma": args.latency_sigma,
+                       "error_rate": args.tl_error_rate, "highlights": args.highlights},
+        "rapidapi": {"latency_ms": args.rapidapi_latency_ms, "sigma": args.latency_sigma,
+                     "error_rate": args.rapidapi_error_rate, "file_bytes": int(args.file_mb * 1024 * 1024)},
+    }
+
+
+def start_services(args, workdir: str, stack: ExitStack) -> Dict[str, Service]:
+    fake = Service("fake-upstreams", BENCH_DIR, "fake_upstreams:app",
+                   {"FAKE_UPSTREAMS_CONFIG": json.dumps(upstream_config(args))}, workdir)
+    stack.callback(fake.close)
+    fake.wait_ready()
+
+    cached = "true" if args.cached else "false"
+    # Read by backend-research, and by the embedding service in FACTCHECK_MODE=inprocess
+    factcheck_env = {
+        "EXA_API_KEY": "bench",
+        "EXA_BASE_URL": f"{fake.url}/exa",
+        "EXA_HTTP2": "false",
+        "FACTCHECK_CACHE_ENABLED": cached,
+        "COMPRESSION_ENABLED": "false",
+    }
+    research = Service("backend-research", RESEARCH_DIR, "main:app", {
+        **factcheck_env,
+        "RAPIDAPI_KEY": "bench",
+        "RAPIDAPI_BASE_URL": f"{fake.url}/rapidapi",
+        "FACTCHECK_CACHE_PATH": os.path.join(workdir, "research", "fact_check_cache.sqlite3"),
+        "VIDEO_STORE_INDEX_PATH": os.path.join(workdir, "research", "video_store.sqlite3"),
+        "VIDEO_STORAGE_DIR": os.path.join(workdir, "research", "videos"),
+        "PUBLIC_BASE_URL": "http://127.0.0.1",
+    }, workdir)
+    stack.callback(research.close)
+
+    embedding_data = os.path.join(workdir, "embedding")
+    embedding = Service("backend-video-embedding", EMBEDDING_DIR, "main:app", {
+        **factcheck_env,
+        "TWELVELABS_API_KEY": "bench",
+        "TWELVELABS_BASE_URL": f"{fake.url}/twelvelabs",
+        "RESEARCH_HOST": research.url,
+        "FACTCHECK_MODE": args.factcheck_mode,
+        "FACTCHECK_RPS": str(args.factcheck_rps),
+        "FACTCHECK_BURST": str(max(1, int(args.factcheck_rps))),
+        "FACTCHECK_MAX_IN_FLIGHT": str(args.factcheck_max_in_flight),
+        "SUMMARY_CACHE_TTL": "3600" if args.cached else "0",
+        "VIDEO_REGISTRY_PATH": os.path.join(embedding_data, "video_registry.sqlite3"),
+        "SUMMARY_CACHE_PATH": os.path.join(embedding_data, "highlight_cache.sqlite3"),
+        "EMBED_JOBS_PATH": os.path.join(embedding_data, "embed_jobs.sqlite3"),
+        "FACTCHECK_CACHE_PATH": os.path.join(embedding_data, "fact_check_cache.sqlite3"),
+    }, workdir)
+    stack.callback(embedding.close)
+    os.makedirs(embedding_data, exist_ok=True)
+
+    research.wait_ready()
+    embedding.wait_ready()
+    return {"research": research, "embedding": embedding}
+
+
+def request_factory(scenario: str, tag: str, cached: bool):
+    if scenario == "fact-check":
+        def make(i: int):
+            n = i % CACHED_CLAIMS if cached else i
+            claim = f"Bench {tag}/{n}: the unemployment rate fell to {n % 10}.{n % 7}% in {1990 + n % 30}"
+            return "POST", "/fact-check", {"startSec": 0, "endSec": 5, "claim": claim}
+        return "research", make
+    if scenario == "highlights-enriched":
+        return "embedding", lambda i: ("POST", "/highlights_enriched",
+                                       {"downloadUrl": f"https://bench.invalid/{tag}/{i}.mp4"})
+    if scenario == "download-file":
+        return "research", lambda i: ("GET", f"/downloadFile/bench-{tag}-{i}/video.mp4", None)
+    raise ValueError(f"unknown scenario {scenario!r}")
+
+
+async def run_scenarios(args, services: Dict[str, Service]) -> List[Dict]:
+    rows = []
+    timeout = httpx.Timeout(args.request_timeout)
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2, max_keepalive_connections=max(args.concurrency))
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            target, make = request_factory(scenario, f"{int(time.time())}-{concurrency}", args.cached)
+            service = services[target]
+            async with httpx.AsyncClient(base_url=service.url, timeout=timeout, limits=limits) as client:
+                if args.warmup:
+                    await run_load(client, lambda i: make(args.requests + i), min(concurrency, args.warmup),
+                                   args.warmup)
+                for s in services.values():
+                    s.reset_peak_rss()
+                result = summarize(await run_load(client, make, concurrency, args.requests))
+            row = {"scenario": scenario, "concurrency": concurrency, **result,
+                   "peakRssMb": {name: s.peak_rss_mb() for name, s in services.items()}}
+            rows.append(row)
+            print(format_row(row), flush=True)
+            if row["firstError"]:
+                print(f"    first error: {row['firstError']}", flush=True)
+    return rows
+
+
+def format_row(row: Dict) -> str:
+    rss = ", ".join(f"{name} {mb}" for name, mb in row["peakRssMb"].items() if mb is not None) or "n/a"
+    return (f"{row['scenario']:<20} c={row['concurrency']:<4} {row['throughput']:8.2f} req/s  "
+            f"p50 {row['p50Ms']:9.1f}  p95 {row['p95Ms']:9.1f}  p99 {row['p99Ms']:9.1f} ms  "
+            f"errors {row['errors']:<4} peak RSS MB: {rss}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(args, rows: List[Dict]) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    commit = git_commit()
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    path = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'nogit'}{'-' + args.label if args.label else ''}.json")
+    meta = {
+        "timestamp": stamp,
+        "commit": commit,
+        "label": args.label,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "requests": args.requests,
+        "cached": args.cached,
+        "factcheckMode": args.factcheck_mode,
+        "factcheckRps": args.factcheck_rps,
+        "upstreams": upstream_config(args),
+    }
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": rows}, f, indent=2)
+    return path
+
+
+def compare(baseline_path: str, rows: List[Dict], tolerance: float) -> bool:
+    """Print per-level deltas against an earlier run; True if nothing regressed beyond `tolerance`."""
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+    ok = True
+    print(f"\ncompared with {os.path.relpath(baseline_path)} (tolerance {tolerance:.0%}):")
+    for row in rows:
+        old = baseline.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        regressions = []
+        if old["throughput"] and row["throughput"] < old["throughput"] * (1 - tolerance):
+            regressions.append("throughput")
+        for key in ("p95Ms", "p99Ms"):
+            if old[key] and row[key] and row[key] > old[key] * (1 + tolerance):
+                regressions.append(key[:3])
+        if row["errors"] > old["errors"]:
+            regressions.append("errors")
+        ok = ok and not regressions
+        print(f"  {row['scenario']:<20} c={row['concurrency']:<4} "
+              f"throughput {_delta(old['throughput'], row['throughput'])}  "
+              f"p95 {_delta(old['p95Ms'], row['p95Ms'])}  p99 {_delta(old['p99Ms'], row['p99Ms'])}  "
+              f"errors {old['errors']} -> {row['errors']}"
+              f"{'  REGRESSED: ' + ', '.join(regressions) if regressions else ''}")
+    return ok
+
+
+def _delta(old: Optional[float], new: Optional[float]) -> str:
+    if not old or new is None:
+        return f"{old} -> {new}"
+    return f"{old:.1f} -> {new:.1f} ({(new - old) / old:+.0%})"
+
+
+def _csv(cast):
+    return lambda value: [cast(v) for v in value.split(",") if v]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=_csv(str), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=_csv(int), default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="measured requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests before each level")
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--cached", action="store_true", help="keep result/summary caches on and repeat claims")
+    parser.add_argument("--factcheck-mode", choices=("http", "inprocess"), default="http")
+    parser.add_argument("--factcheck-rps", type=float, default=1000.0)
+    parser.add_argument("--factcheck-max-in-flight", type=int, default=64)
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="log-normal spread of every upstream")
+    parser.add_argument("--exa-latency-ms", type=float, default=800)
+    parser.add_argument("--exa-error-rate", type=float, default=0.0)
+    parser.add_argument("--citations", type=int, default=5)
+    parser.add_argument("--text-chars", type=int, default=2000)
+    parser.add_argument("--tl-latency-ms", type=float, default=1500)
+    parser.add_argument("--tl-error-rate", type=float, default=0.0)
+    parser.add_argument("--highlights", type=int, default=8)
+    parser.add_argument("--rapidapi-latency-ms", type=float, default=150)
+    parser.add_argument("--rapidapi-error-rate", type=float, default=0.0)
+    parser.add_argument("--file-mb", type=float, default=1.0)
+    parser.add_argument("--label", default="", help="suffix for the results file name")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    with ExitStack() as stack:
+        workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-"))
+        services = start_services(args, workdir, stack)
+        rows = asyncio.run(run_scenarios(args, services))
+
+    path = save(args, rows)
+    print(f"\nresults written to {os.path.relpath(path)}")
+    if args.compare and not compare(args.compare, rows, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
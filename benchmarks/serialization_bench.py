@@ -0,0 +1,117 @@
+"""
+Per-clip encode/decode cost of a FactCheckResponse, before and after the fast paths.
+
+    python benchmarks/serialization_bench.py [--citations 5] [--text-chars 3000] [-n 2000]
+
+Measures what backend-video-embedding does with one /fact-check body from
+backend-research until it is part of the /highlights_enriched output:
+
+  before     json.loads + FactCheckResponse(**data), then FastAPI's response_model
+             path (re-validate EnrichedClip, jsonable_encoder, json.dumps)
+  validated  pydantic-core validate_json + dump_json, spliced into the item
+  trusted    FACTCHECK_TRUSTED=1: the body is spliced in without decoding
+
+plus backend-research's own encode of the response (jsonable_encoder + json.dumps
+before, model_dump_json after).
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend-video-embedding"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from fast_json import ORJSON_AVAILABLE, splice  # noqa: E402
+from models import Clip, EnrichedClip, FactCheckResponse  # noqa: E402
+
+
+def sample_payload(citations: int, text_chars: int) -> bytes:
+    cites = [
+        {
+            "id": f"https://example.com/article/{i}",
+            "url": f"https://example.com/article/{i}",
+            "title": f"Source article {i}",
+            "author": "Reporter",
+            "publishedDate": "2024-05-01T00:00:00.000Z",
+            "text": ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (text_chars // 57 + 1))[:text_chars],
+            "favicon": "https://example.com/favicon.ico",
+        }
+        for i in range(citations)
+    ]
+    data = {
+        "startSec": 12.0,
+        "endSec": 19.5,
+        "title": "GDP growth claim",
+        "description": "The speaker says GDP grew 3% last year.",
+        "truthfulnessScore": 4,
+        "response": "Official statistics report 2.9% growth, so the claim is mostly accurate. " * 4,
+        "sources": cites,
+        "exaResponse": {
+            "answer": "TITLE: GDP growth claim\nDESCRIPTION: ...\nSCORE: 4\nANALYSIS: ...",
+            "citations": cites,
+            "costDollars": {
+                "total": 0.005,
+                "breakDown": [{"search": 0.005, "contents": 0, "breakdown": {"neuralSearch": 0.005}}],
+                "perRequestPrices": {}, "perPagePrices": {},
+            },
+        },
+        "cached": False,
+    }
+    return json.dumps(data).encode("utf-8")
+
+
+def per_call_us(fn, number: int) -> float:
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--citations", type=int, default=5)
+    parser.add_argument("--text-chars", type=int, default=3000)
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    raw = sample_payload(args.citations, args.text_chars)
+    clip = Clip(startSec=12.0, endSec=19.5, description="GDP grew 3% last year")
+    model = FactCheckResponse.model_validate_json(raw)
+    items_adapter = TypeAdapter(List[EnrichedClip])
+    fact_check = TypeAdapter(FactCheckResponse)
+
+    def embedding_before() -> bytes:
+        item = EnrichedClip(clip=clip, factCheck=FactCheckResponse(**json.loads(raw)))
+        validated = items_adapter.validate_python([item], from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+    def embedding_validated() -> bytes:
+        body = fact_check.dump_json(fact_check.validate_json(raw))
+        return splice({"clip": clip.model_dump()}, {"factCheck": body})
+
+    def embedding_trusted() -> bytes:
+        return splice({"clip": clip.model_dump()}, {"factCheck": raw})
+
+    cases = [
+        ("embedding  before     loads + validate + response_model encode", embedding_before),
+        ("embedding  validated  validate_json + dump_json + splice", embedding_validated),
+        ("embedding  trusted    splice raw body", embedding_trusted),
+        ("research   before     jsonable_encoder + json.dumps", lambda: json.dumps(jsonable_encoder(model))),
+        ("research   after      model_dump_json", model.model_dump_json),
+    ]
+
+    print(f"payload {len(raw) / 1024:.1f} KiB, {args.citations} citations x {args.text_chars} chars, "
+          f"orjson={'yes' if ORJSON_AVAILABLE else 'no'}")
+    baseline = {}
+    for label, fn in cases:
+        us = per_call_us(fn, args.number)
+        kind = label.split()[0]
+        baseline.setdefault(kind, us)
+        print(f"{label:<64} {us:9.1f} us/clip  {baseline[kind] / us:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
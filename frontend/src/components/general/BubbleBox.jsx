@@ -6,7 +6,7 @@ import { motion } from "framer-motion";
 const BubbleBox = ({
   header,
   content,
-  sources,
+  sources = [],
   confidence,
   hasSources = true,
 }) => {
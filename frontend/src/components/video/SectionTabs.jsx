@@ -35,7 +35,12 @@ const SectionTabs = ({ id, setError, seekFunction }) => {
     if (downloadVideoResult?.length > 0) {
       console.log(downloadVideoResult?.factCheck);
       console.log(downloadVideoResult?.clip);
-      setClaimsAnswers(downloadVideoResult.map((item) => item.factCheck));
+      // factCheck is null while it is still streaming in (or if it failed): list only finished ones
+      setClaimsAnswers(
+        downloadVideoResult
+          .map((item) => item.factCheck)
+          .filter((factCheck) => factCheck != null)
+      );
       setFlaggedMoments(downloadVideoResult.map((item) => item.clip));
 
       setDownloadVideoResult(null);
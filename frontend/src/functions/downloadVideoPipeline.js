@@ -17,8 +17,8 @@ const useDownloadVideo = () => {
       setLoading(true);
       console.log(url);
 
-      // POST /download
-      let res = await fetch(import.meta.env.VITE_BACKEND_URL + "/download", {
+      // POST /ingest: the backend starts the job, polls it and stores the file
+      let res = await fetch(import.meta.env.VITE_BACKEND_URL + "/ingest", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -30,72 +30,38 @@ const useDownloadVideo = () => {
         }),
       });
 
-      let data = await res.json();
+      const data = await res.json();
       if (data?.status !== "ok") {
-        throw new Error("Error: status is not ok on downlod");
+        throw new Error("Error: status is not ok on ingest");
       }
       console.log(data);
-      const jobId = data.jobId;
-      if (!jobId) {
-        throw new Error("Error: jobId is invalid");
-      }
-      url = new URL(import.meta.env.VITE_BACKEND_URL + "/status/" + jobId);
-
-      // GET /status
-      let fileName;
-
-      while (true) {
-        const res = await fetch(url);
-        const data = await res.json();
-        console.log(data);
-
-        // Transport / API status
-        if (data?.status !== "ok") {
-          throw new Error("Error: status is not ok on checking jobId");
-        }
-
-        // Job status
-        if (data?.data?.status === "completed") {
-          console.log("Job completed!");
-          fileName = data?.data?.filename;
-          console.log(fileName);
-          break;
-        }
-
-        await sleep(2500); // wait before next request
-      }
-
-      if (!fileName) {
-        throw new Error("Error: fileName is invalid");
-      }
-      console.log(jobId);
-      console.log(fileName);
-      url = new URL(
-        import.meta.env.VITE_BACKEND_URL +
-          "/downloadFile/" +
-          jobId +
-          "/" +
-          jobId +
-          ".mp4"
-      );
-      console.log(url);
-
-      // GET /downloadFile
-      res = await fetch(url);
-      data = await res.json();
       const videoURL = data?.direct_video_url;
-      console.log(data);
 
-      res = await fetch("http://127.0.0.1:8001/highlights_enriched", {
+      // POST /highlights_enriched/stream: clips first, then each fact-check as it resolves
+      res = await fetch("http://127.0.0.1:8001/highlights_enriched/stream?view=compact", {
         method: "POST",
         body: JSON.stringify({ downloadUrl: videoURL }),
         headers: {
           "Content-Type": "application/json",
         },
       });
-      data = await res.json();
-      console.log(data);
-      setDownloadVideoResult(data);
+      if (!res.ok) {
+        throw new Error("Error: highlights request failed with " + res.status);
+      }
+
+      let results = [];
+      for await (const event of readNdjson(res)) {
+        console.log(event);
+        if (event.event === "clips") {
+          results = event.clips.map((clip) => ({ clip, factCheck: null }));
+          setDownloadVideoResult(results);
+          setLoading(false); // show clips while fact-checks stream in
+        } else if (event.event === "factCheck") {
+          results = [...results];
+          results[event.index] = event.item;
+          setDownloadVideoResult(results);
+        }
+      }
     } catch (error) {
       setDownloadError("Error while downloading video: " + error);
       return;
@@ -115,6 +81,22 @@ const useDownloadVideo = () => {
 
 export default useDownloadVideo;
 
-function sleep(ms) {
-  return new Promise((resolve) => setTimeout(resolve, ms));
+async function* readNdjson(res) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let newline;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) yield JSON.parse(line);
+    }
+  }
+  if (buffer.trim()) yield JSON.parse(buffer);
 }